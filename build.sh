@@ -5,5 +5,6 @@ set -o errexit
 pip install --upgrade pip
 pip install -r requirements.txt
 
-python manage.py collectstatic --no-input
+# Hashed, pre-compressed files and staticfiles.json; see pizza_mate/storage.py
+python manage.py collectstatic --no-input --clear
 python manage.py migrate
@@ -1,8 +1,25 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils import timezone
 
-from pizza.forms import PizzaForm
-from pizza.models import CustomUser, Pizza, PizzaSize, Ingredient
+from pizza.models import (
+    CustomUser,
+    DailyPizzaSales,
+    Order,
+    OrderPizza,
+    Pizza,
+    PizzaSize,
+    Ingredient,
+    Task,
+)
+from pizza.pagination import EstimatedCountPaginator
+
+
+# Changelists over tables that grow with traffic: no COUNT(*) of the
+# whole table next to the filtered count, estimated counts on Postgres
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(CustomUser)
@@ -22,14 +39,13 @@ class CustomUserAdmin(UserAdmin):
 
 
 @admin.register(Pizza)
-class PizzaAdmin(admin.ModelAdmin):
-    form = PizzaForm
+class PizzaAdmin(LargeTableAdmin):
     list_display = ("name", "base_price", "size", "user",)
-
-    class Media:
-        css = {
-            "all": ("css/admin_style.css",)
-        }
+    list_select_related = ("size", "user")
+    list_filter = ("size",)
+    # icontains on name uses the trigram index on Postgres
+    search_fields = ("name",)
+    autocomplete_fields = ("ingredients", "user")
 
 
 @admin.register(PizzaSize)
@@ -39,4 +55,78 @@ class PizzaSizeAdmin(admin.ModelAdmin):
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
-    list_display = ("name", "description")
+    list_display = ("name", "ingredient_type", "description")
+    list_select_related = ("ingredient_type",)
+    list_filter = ("ingredient_type",)
+    search_fields = ("name",)
+
+
+class OrderPizzaInline(admin.TabularInline):
+    model = OrderPizza
+    extra = 0
+    autocomplete_fields = ("pizza",)
+    fields = (
+        "pizza",
+        "pizza_name",
+        "size",
+        "size_name",
+        "quantity",
+        "unit_price",
+        "ingredient_deltas",
+    )
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ("id", "customer", "order_date", "total_price")
+    list_select_related = ("customer",)
+    date_hierarchy = "order_date"
+    # Exact lookups hit the primary key and the unique username index
+    search_fields = ("=id", "=customer__username")
+    autocomplete_fields = ("customer",)
+    ordering = ("-order_date", "-id")
+    inlines = (OrderPizzaInline,)
+
+
+@admin.register(DailyPizzaSales)
+class DailyPizzaSalesAdmin(LargeTableAdmin):
+    list_display = (
+        "date", "pizza_name", "size_name", "orders", "quantity", "revenue",
+    )
+    list_filter = ("size_name",)
+    date_hierarchy = "date"
+    readonly_fields = (
+        "date",
+        "pizza",
+        "pizza_name",
+        "size_name",
+        "orders",
+        "quantity",
+        "revenue",
+    )
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdmin):
+    list_display = (
+        "id", "name", "status", "attempts", "run_after", "finished_at",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("idempotency_key",)
+    readonly_fields = (
+        "locked_by", "locked_at", "last_error", "created_at", "finished_at",
+    )
+    actions = ("retry_tasks",)
+
+    @admin.action(description="Retry selected tasks now")
+    def retry_tasks(self, request, queryset) -> None:
+        updated = queryset.exclude(status=Task.RUNNING).update(
+            status=Task.QUEUED,
+            attempts=0,
+            run_after=timezone.now(),
+            finished_at=None,
+        )
+        self.message_user(request, f"Queued {updated} tasks")
@@ -0,0 +1,293 @@
+"""
+Query-count, latency and memory benchmarks for every route in pizza.urls.
+
+A synthetic catalogue is seeded from ingredients.json, each route is driven
+through the test client and the whole run is rolled back afterwards.
+"""
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from pizza.catalogue import bump_catalogue_version
+from pizza.models import (
+    CustomUser,
+    Ingredient,
+    IngredientType,
+    Order,
+    OrderPizza,
+    Pizza,
+    PizzaSize,
+)
+from pizza.pagination import encode_cursor
+from pizza.search import get_search_backend
+from pizza.urls import app_name, urlpatterns
+
+FIXTURE_PATH = settings.BASE_DIR / "ingredients.json"
+BENCHMARK_USERNAME = "benchmark_user"
+BENCHMARK_PASSWORD = "benchmark-pass-12345"
+
+
+class Rollback(Exception):
+    pass
+
+
+# Counts executed statements; unlike connection.queries it survives the
+# reset_queries() call Django makes at the start of every request
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def load_fixture() -> dict:
+    with open(FIXTURE_PATH) as fixture_file:
+        fixture = json.load(fixture_file)
+    objects = {}
+    for obj in fixture:
+        objects.setdefault(obj["model"], []).append(obj["fields"])
+    return objects
+
+
+def seed_catalogue(pizzas, ingredients, orders, seed=0) -> dict:
+    rng = random.Random(seed)
+    fixture = load_fixture()
+
+    if not PizzaSize.objects.exists():
+        PizzaSize.objects.bulk_create(
+            PizzaSize(**fields) for fields in fixture["pizza.pizzasize"]
+        )
+    sizes = list(PizzaSize.objects.all())
+
+    ingredient_types = [
+        IngredientType.objects.get_or_create(name=fields["name"])[0]
+        for fields in fixture["pizza.ingredienttype"]
+    ]
+    base_ingredients = fixture["pizza.ingredient"]
+    created_ingredients = Ingredient.objects.bulk_create(
+        Ingredient(
+            name=f"{fields['name']} #{number}",
+            description=fields["description"],
+            ingredient_type=rng.choice(ingredient_types),
+        )
+        for number, fields in (
+            (number, base_ingredients[number % len(base_ingredients)])
+            for number in range(ingredients)
+        )
+    )
+
+    user = CustomUser.objects.create_user(
+        username=BENCHMARK_USERNAME,
+        password=BENCHMARK_PASSWORD,
+        is_staff=True,
+    )
+    created_pizzas = Pizza.objects.bulk_create(
+        Pizza(
+            name=f"Benchmark pizza #{number}",
+            description="Synthetic benchmark pizza",
+            base_price=rng.randint(120, 300),
+            size=rng.choice(sizes),
+            user=user if number % 10 == 0 else None,
+        )
+        for number in range(pizzas)
+    )
+    Pizza.ingredients.through.objects.bulk_create(
+        Pizza.ingredients.through(
+            pizza_id=pizza.id, ingredient_id=ingredient.id
+        )
+        for pizza in created_pizzas
+        for ingredient in rng.sample(
+            created_ingredients, min(5, len(created_ingredients))
+        )
+    )
+
+    created_orders = Order.objects.bulk_create(
+        Order(customer=user, total_price=0) for _ in range(orders)
+    )
+    order_pizzas = []
+    for order in created_orders:
+        for pizza in rng.sample(created_pizzas, min(3, len(created_pizzas))):
+            size = rng.choice(sizes)
+            order_pizzas.append(
+                OrderPizza(
+                    order=order,
+                    pizza=pizza,
+                    quantity=rng.randint(1, 3),
+                    pizza_name=pizza.name,
+                    size=size,
+                    size_name=size.name,
+                    unit_price=round(pizza.base_price * size.multiplier),
+                )
+            )
+    OrderPizza.objects.bulk_create(order_pizzas)
+
+    # Bulk inserts skip signals, so refresh derived data by hand
+    get_search_backend().rebuild()
+    PizzaSize.invalidate_size_table()
+    bump_catalogue_version()
+
+    return {
+        "user": user,
+        "pizza": created_pizzas[1 % len(created_pizzas)],
+        "ingredients": created_ingredients[:3],
+        "size": sizes[0].name,
+    }
+
+
+def add_to_cart(client, context) -> None:
+    client.post(
+        reverse("pizza:order-pizza", kwargs={"pk": context["pizza"].id}),
+        {"size": context["size"]},
+    )
+
+
+def get_scenarios(context) -> dict:
+    pizza = context["pizza"]
+    ingredient_ids = [ingredient.id for ingredient in context["ingredients"]]
+    return {
+        "home-page": {"method": "get", "url": reverse("pizza:home-page")},
+        "menu-page": {
+            "method": "get",
+            "url": reverse("pizza:menu-page"),
+            "data": {"after": encode_cursor(pizza, Pizza._meta.ordering)},
+        },
+        "customuser-create": {
+            "method": "get",
+            "url": reverse("pizza:customuser-create"),
+            "anonymous": True,
+        },
+        "pizza-detail": {
+            "method": "get",
+            "url": reverse("pizza:pizza-detail", kwargs={"pk": pizza.id}),
+            "data": {"size": context["size"]},
+        },
+        "update-pizza-ingredients": {
+            "method": "post",
+            "url": reverse(
+                "pizza:update-pizza-ingredients", kwargs={"pk": pizza.id}
+            ),
+            "data": {"size": context["size"], "ingredients": ingredient_ids},
+        },
+        "pizza-prices": {
+            "method": "get",
+            "url": reverse("pizza:pizza-prices", kwargs={"pk": pizza.id}),
+        },
+        "order-pizza": {
+            "method": "post",
+            "url": reverse("pizza:order-pizza", kwargs={"pk": pizza.id}),
+            "data": {"size": context["size"]},
+        },
+        "cart": {
+            "method": "get",
+            "url": reverse("pizza:cart"),
+            "setup": add_to_cart,
+        },
+        "order-confirmation": {
+            "method": "post",
+            "url": reverse("pizza:order-confirmation"),
+            "setup": add_to_cart,
+        },
+        "user-orders": {"method": "get", "url": reverse("pizza:user-orders")},
+        "profile": {"method": "get", "url": reverse("pizza:profile")},
+        "custom-pizza": {
+            "method": "get",
+            "url": reverse("pizza:custom-pizza"),
+        },
+        "menu-cache-stats": {
+            "method": "get",
+            "url": reverse("pizza:menu-cache-stats"),
+        },
+    }
+
+
+def prepare_scenario(client, scenario, context) -> None:
+    if "setup" in scenario:
+        scenario["setup"](client, context)
+
+
+def request_scenario(client, scenario):
+    return getattr(client, scenario["method"])(
+        scenario["url"], scenario.get("data", {})
+    )
+
+
+# Query count of a warm request, its median wall time and peak allocation
+def measure_scenario(scenario, context, repeat) -> dict:
+    client = Client()
+    if not scenario.get("anonymous"):
+        client.force_login(context["user"])
+    prepare_scenario(client, scenario, context)
+    request_scenario(client, scenario)
+
+    prepare_scenario(client, scenario, context)
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        response = request_scenario(client, scenario)
+
+    timings = []
+    for _ in range(repeat):
+        prepare_scenario(client, scenario, context)
+        start = time.perf_counter()
+        request_scenario(client, scenario)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    prepare_scenario(client, scenario, context)
+    tracemalloc.start()
+    request_scenario(client, scenario)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "queries": queries.count,
+        "median_ms": round(statistics.median(timings), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(pizzas, ingredients, orders, repeat=5) -> dict:
+    result = {"pizzas": pizzas, "ingredients": ingredients, "orders": orders}
+    try:
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ), transaction.atomic():
+            context = seed_catalogue(pizzas, ingredients, orders)
+            scenarios = get_scenarios(context)
+            missing = {
+                pattern.name for pattern in urlpatterns
+            } - scenarios.keys()
+            if missing:
+                raise ValueError(
+                    f"No benchmark scenario for {app_name} routes: "
+                    f"{', '.join(sorted(missing))}"
+                )
+            result["routes"] = {
+                name: measure_scenario(scenario, context, repeat)
+                for name, scenario in scenarios.items()
+            }
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        PizzaSize.invalidate_size_table()
+        bump_catalogue_version()
+    return result
+
+
+def find_query_growth(small, large) -> list:
+    return [
+        f"{name}: {small['routes'][name]['queries']} queries with "
+        f"{small['pizzas']} pizzas, {route['queries']} with "
+        f"{large['pizzas']} pizzas"
+        for name, route in large["routes"].items()
+        if route["queries"] > small["routes"][name]["queries"]
+    ]
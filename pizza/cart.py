@@ -0,0 +1,127 @@
+from django.db.models import Count
+
+from pizza.catalogue import get_catalogue
+from pizza.models import OrderPizza, Pizza, PizzaSize
+from pizza.recalculation import get_ingredient_deltas, get_unit_price
+
+CART_SESSION_KEY = "cart"
+
+
+class Cart:
+    """
+    Session-backed list of pizza lines. Each line is stored as a compact
+    ``[pizza_id, size_name, quantity]`` list, followed by the chosen
+    ``{ingredient_id: quantity}`` for customised pizzas, so the cart fits
+    in a signed cookie. Prices are always recomputed on read.
+    """
+
+    def __init__(self, session) -> None:
+        self.session = session
+        self.lines = session.get(CART_SESSION_KEY, [])
+
+    def __len__(self) -> int:
+        return sum(line[2] for line in self.lines)
+
+    def save(self) -> None:
+        self.session[CART_SESSION_KEY] = self.lines
+        self.session.modified = True
+
+    def add(self, pizza_id, size, quantity=1, ingredients=None) -> None:
+        if ingredients is not None:
+            ingredients = {
+                str(ingredient_id): ingredient_quantity
+                for ingredient_id, ingredient_quantity in sorted(
+                    ingredients.items()
+                )
+            }
+        chosen = [] if ingredients is None else [ingredients]
+        for line in self.lines:
+            if line[:2] == [pizza_id, size] and line[3:] == chosen:
+                line[2] += quantity
+                break
+        else:
+            self.lines.append([pizza_id, size, quantity, *chosen])
+        self.save()
+
+    def remove(self, index) -> None:
+        if 0 <= index < len(self.lines):
+            del self.lines[index]
+            self.save()
+
+    def clear(self) -> None:
+        self.lines = []
+        self.save()
+
+    def get_lines(self) -> list:
+        pizzas = Pizza.objects.annotate(
+            ingredient_count=Count("ingredients")
+        ).in_bulk({line[0] for line in self.lines})
+        multipliers = PizzaSize.get_multipliers()
+        catalogue = get_catalogue()
+
+        lines = []
+        for index, (pizza_id, size, quantity, *chosen) in enumerate(
+            self.lines
+        ):
+            pizza = pizzas.get(pizza_id)
+            if pizza is None or size not in multipliers:
+                continue
+
+            ingredients = None
+            if chosen:
+                ingredients = {
+                    ingredient: chosen[0][str(ingredient.id)]
+                    for ingredient in catalogue.get_ingredients(
+                        chosen[0].keys()
+                    )
+                }
+
+            unit_price = get_unit_price(pizza, size, ingredients, multipliers)
+            lines.append(
+                {
+                    "index": index,
+                    "pizza": pizza,
+                    "size": size,
+                    "ingredients": ingredients,
+                    "quantity": quantity,
+                    "unit_price": unit_price,
+                    "total_price": unit_price * quantity,
+                }
+            )
+        return lines
+
+
+# Order rows with a snapshot of the priced cart lines. Lines that end up
+# identical (e.g. unchanged ingredients picked explicitly) are merged
+def build_order_pizzas(order, lines) -> list:
+    customised_ids = {
+        line["pizza"].id for line in lines if line["ingredients"] is not None
+    }
+    base_ingredient_ids = {}
+    for pizza_id, ingredient_id in Pizza.ingredients.through.objects.filter(
+        pizza_id__in=customised_ids
+    ).values_list("pizza_id", "ingredient_id"):
+        base_ingredient_ids.setdefault(pizza_id, set()).add(ingredient_id)
+    size_ids = PizzaSize.get_size_ids()
+
+    order_pizzas = {}
+    for line in lines:
+        deltas = get_ingredient_deltas(
+            base_ingredient_ids.get(line["pizza"].id, set()),
+            line["ingredients"],
+        )
+        key = (line["pizza"].id, line["size"], tuple(deltas.items()))
+        if key in order_pizzas:
+            order_pizzas[key].quantity += line["quantity"]
+            continue
+        order_pizzas[key] = OrderPizza(
+            order=order,
+            pizza=line["pizza"],
+            quantity=line["quantity"],
+            pizza_name=line["pizza"].name,
+            size_id=size_ids.get(line["size"]),
+            size_name=line["size"],
+            unit_price=line["unit_price"],
+            ingredient_deltas=deltas,
+        )
+    return list(order_pizzas.values())
@@ -0,0 +1,188 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from pizza.models import Ingredient, IngredientType
+from pizza_mate.caches import get_invalidation_timeout
+
+CATALOGUE_VERSION_KEY = "pizza:catalogue-version"
+CATALOGUE_MODIFIED_KEY = "pizza:catalogue-modified"
+CATALOGUE_KEY = "pizza:catalogue:{version}"
+CATALOGUE_TIMEOUT = 60 * 60 * 24
+USER_VERSION_KEY = "pizza:user-version:{user_id}"
+USER_VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+_local_catalogue = None
+
+
+class IngredientCatalogue:
+    """Read-only snapshot of ingredient types and ingredients."""
+
+    def __init__(self, version, ingredient_types, ingredients) -> None:
+        self.version = version
+        self.ingredient_types = list(ingredient_types)
+        self.ingredients = {
+            ingredient.id: ingredient for ingredient in ingredients
+        }
+        self.ingredients_by_type = {
+            ingredient_type.id: [] for ingredient_type in self.ingredient_types
+        }
+        for ingredient in self.ingredients.values():
+            self.ingredients_by_type.setdefault(
+                ingredient.ingredient_type_id, []
+            ).append(ingredient)
+
+    def get_ingredients(self, ingredient_ids) -> list:
+        """Known ingredients for the given (possibly string) ids."""
+        ingredients = []
+        for ingredient_id in ingredient_ids:
+            try:
+                ingredient = self.ingredients.get(int(ingredient_id))
+            except (TypeError, ValueError):
+                continue
+            if ingredient is not None:
+                ingredients.append(ingredient)
+        return ingredients
+
+    def get_type_groups(self) -> list:
+        return [
+            (ingredient_type, self.ingredients_by_type[ingredient_type.id])
+            for ingredient_type in self.ingredient_types
+        ]
+
+    def get_ingredients_by_slug(self) -> dict:
+        return {
+            ingredient_type.name.lower().replace(" ", "_"): ingredients
+            for ingredient_type, ingredients in self.get_type_groups()
+        }
+
+
+def get_catalogue_cache_alias() -> str:
+    return getattr(settings, "PIZZA_CATALOGUE_CACHE", "default")
+
+
+def get_catalogue_cache():
+    return caches[get_catalogue_cache_alias()]
+
+
+# Never expires in a shared cache. In a per-process cache the version
+# restarts every LOCAL_CACHE_TIMEOUT seconds, dropping whatever this
+# process cached under it, because bumps made elsewhere never arrive
+def get_version_timeout():
+    return get_invalidation_timeout(get_catalogue_cache_alias())
+
+
+def get_user_version_timeout():
+    return get_invalidation_timeout(
+        get_catalogue_cache_alias(), USER_VERSION_TIMEOUT
+    )
+
+
+def get_catalogue_version() -> int:
+    cache = get_catalogue_cache()
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # Start from a timestamp so an evicted counter never repeats
+        # a version another process still holds
+        cache.add(
+            CATALOGUE_VERSION_KEY, time.time_ns(), get_version_timeout()
+        )
+        version = cache.get(CATALOGUE_VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version() -> None:
+    global _local_catalogue
+    cache = get_catalogue_cache()
+    try:
+        cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        cache.add(
+            CATALOGUE_VERSION_KEY, time.time_ns(), get_version_timeout()
+        )
+    cache.set(CATALOGUE_MODIFIED_KEY, int(time.time()), get_version_timeout())
+    _local_catalogue = None
+
+
+# A user's custom pizzas are versioned apart from the public catalogue;
+# the version is the change time in nanoseconds
+def bump_user_version(user_id) -> None:
+    get_catalogue_cache().set(
+        USER_VERSION_KEY.format(user_id=user_id),
+        time.time_ns(),
+        get_user_version_timeout(),
+    )
+
+
+def bump_pizza_versions(owner_ids) -> None:
+    """
+    Invalidate pages showing pizzas of the given owners. A public pizza
+    (owner ``None``) bumps the catalogue version; custom pizzas only bump
+    their owners' versions, leaving every other visitor's caches warm.
+    """
+    owner_ids = set(owner_ids)
+    if None in owner_ids:
+        bump_catalogue_version()
+        return
+    for user_id in owner_ids:
+        bump_user_version(user_id)
+
+
+# Version and last change time (epoch seconds) in one cache round trip.
+# The version of each given user's custom pizzas is folded into both
+def get_catalogue_state(user_ids=()) -> tuple:
+    cache = get_catalogue_cache()
+    user_keys = [
+        USER_VERSION_KEY.format(user_id=user_id) for user_id in user_ids
+    ]
+    state = cache.get_many(
+        [CATALOGUE_VERSION_KEY, CATALOGUE_MODIFIED_KEY, *user_keys]
+    )
+    version = state.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        version = get_catalogue_version()
+    modified = state.get(CATALOGUE_MODIFIED_KEY)
+    if modified is None:
+        # Unknown after an eviction; assume the catalogue just changed
+        cache.add(
+            CATALOGUE_MODIFIED_KEY, int(time.time()), get_version_timeout()
+        )
+        modified = cache.get(CATALOGUE_MODIFIED_KEY)
+    for user_key in user_keys:
+        user_version = state.get(user_key)
+        if user_version is None:
+            cache.add(user_key, time.time_ns(), get_user_version_timeout())
+            user_version = cache.get(user_key)
+        version = f"{version}.{user_version}"
+        modified = max(modified, user_version // 10 ** 9)
+    return version, modified
+
+
+def load_catalogue(version) -> IngredientCatalogue:
+    return IngredientCatalogue(
+        version,
+        IngredientType.objects.order_by("id"),
+        Ingredient.objects.all(),
+    )
+
+
+def get_catalogue() -> IngredientCatalogue:
+    global _local_catalogue
+    version = get_catalogue_version()
+    catalogue = _local_catalogue
+    if catalogue is not None and catalogue.version == version:
+        return catalogue
+
+    shared = getattr(settings, "PIZZA_CATALOGUE_SHARED", False)
+    cache_key = CATALOGUE_KEY.format(version=version)
+    catalogue = get_catalogue_cache().get(cache_key) if shared else None
+    if catalogue is None:
+        catalogue = load_catalogue(version)
+        if shared:
+            get_catalogue_cache().set(
+                cache_key, catalogue, CATALOGUE_TIMEOUT
+            )
+
+    _local_catalogue = catalogue
+    return catalogue
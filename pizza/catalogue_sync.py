@@ -0,0 +1,309 @@
+"""
+Streaming catalogue import and export in the ``loaddata`` fixture format
+(``ingredients.json``). Objects are read one at a time from the JSON
+array and upserted by primary key in batches; only rows that differ from
+the database are written, so importing the same file twice changes
+nothing. Signals are not sent for bulk writes, so the caches and the
+search index they maintain are refreshed once at the end.
+"""
+import json
+import re
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from pizza.catalogue import bump_catalogue_version
+from pizza.images import schedule_renditions
+from pizza.models import Ingredient, IngredientType, Pizza, PizzaSize
+from pizza.recalculation import invalidate_pizza_summary
+from pizza.search import get_search_backend
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"\s*")
+
+# Fixture label -> model and synced fields, in dependency order
+CATALOGUE_MODELS = {
+    "pizza.pizzasize": (PizzaSize, ("name", "weight", "multiplier")),
+    "pizza.ingredienttype": (IngredientType, ("name",)),
+    "pizza.ingredient": (
+        Ingredient,
+        ("name", "description", "ingredient_type"),
+    ),
+    "pizza.pizza": (
+        Pizza,
+        ("name", "description", "base_price", "size", "image"),
+    ),
+}
+
+
+class CatalogueSyncError(ValueError):
+    pass
+
+
+class JSONArrayReader:
+    """Yields the items of a top-level JSON array read in chunks."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+
+    def read_more(self) -> bool:
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the stream."""
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return ""
+
+    def decode_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError as error:
+                if not self.read_more():
+                    raise CatalogueSyncError(f"Invalid JSON: {error}")
+                continue
+            # A number cut off by the chunk boundary may go on
+            if end == len(self.buffer) and self.read_more():
+                continue
+            self.position = end
+            return value
+
+    def expect(self, characters) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            raise CatalogueSyncError(
+                f"Expected one of {characters!r}, found {character!r}"
+            )
+        self.position += 1
+        return character
+
+    def __iter__(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(",]") == "]":
+                return
+
+
+def get_field_values(model, field_names, fields) -> dict:
+    """Model attribute values for a fixture's ``fields``."""
+    values = {}
+    for name in field_names:
+        field = model._meta.get_field(name)
+        value = fields[name] if name in fields else field.get_default()
+        values[field.attname] = field.to_python(value)
+    return values
+
+
+def get_ingredient_sets(pizza_ids) -> dict:
+    ingredient_sets = {pizza_id: set() for pizza_id in pizza_ids}
+    for pizza_id, ingredient_id in Pizza.ingredients.through.objects.filter(
+        pizza_id__in=pizza_ids
+    ).values_list("pizza_id", "ingredient_id"):
+        ingredient_sets[pizza_id].add(ingredient_id)
+    return ingredient_sets
+
+
+class CatalogueImport:
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False) -> None:
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.report = {
+            label: {"created": 0, "updated": 0, "unchanged": 0}
+            for label in CATALOGUE_MODELS
+        }
+        self.changed_ids = {label: set() for label in CATALOGUE_MODELS}
+
+    def run(self, stream) -> dict:
+        with transaction.atomic():
+            label, batch = None, []
+            for item in JSONArrayReader(stream):
+                if not isinstance(item, dict) or "pk" not in item:
+                    raise CatalogueSyncError(f"Not a fixture object: {item}")
+                if item.get("model") not in CATALOGUE_MODELS:
+                    raise CatalogueSyncError(
+                        f"Unsupported model: {item.get('model')}"
+                    )
+                if batch and (
+                    item["model"] != label or len(batch) >= self.batch_size
+                ):
+                    self.sync_batch(label, batch)
+                    batch = []
+                label = item["model"]
+                batch.append(item)
+            if batch:
+                self.sync_batch(label, batch)
+
+            if self.dry_run:
+                transaction.set_rollback(True)
+            else:
+                self.refresh_derived_data()
+        return self.report
+
+    def sync_batch(self, label, items) -> None:
+        model, field_names = CATALOGUE_MODELS[label]
+        incoming = {
+            item["pk"]: get_field_values(
+                model, field_names, item.get("fields", {})
+            )
+            for item in items
+        }
+        attnames = list(next(iter(incoming.values())).keys())
+        # The upsert matches on the primary key alone, so a fixture pizza
+        # must never land on a user's custom pizza
+        owner = ["user_id"] if model is Pizza else []
+        existing = {
+            row.pop("id"): row
+            for row in model.objects.filter(pk__in=incoming)
+            .order_by()
+            .values("id", *owner, *attnames)
+        }
+        custom_ids = sorted(
+            pk for pk, row in existing.items() if row.pop("user_id", None)
+        )
+        if custom_ids:
+            raise CatalogueSyncError(
+                f"Pizzas {custom_ids} are custom pizzas, not shared ones"
+            )
+
+        ingredient_sets = {}
+        current_sets = {}
+        if model is Pizza:
+            ingredient_sets = {
+                item["pk"]: set(item.get("fields", {}).get("ingredients", []))
+                for item in items
+            }
+            current_sets = get_ingredient_sets(list(existing))
+
+        changed = []
+        changed_sets = []
+        counts = self.report[label]
+        for pk, values in incoming.items():
+            if pk not in existing:
+                counts["created"] += 1
+            elif existing[pk] != values or (
+                model is Pizza and current_sets[pk] != ingredient_sets[pk]
+            ):
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            changed.append(model(pk=pk, **values))
+            if model is Pizza and current_sets.get(pk) != ingredient_sets[pk]:
+                changed_sets.append(pk)
+
+        self.changed_ids[label].update(obj.pk for obj in changed)
+        if changed:
+            model.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=[model._meta.pk.name],
+                update_fields=list(field_names),
+            )
+        if changed_sets:
+            self.set_ingredients(changed_sets, ingredient_sets)
+
+    def set_ingredients(self, pizza_ids, ingredient_sets) -> None:
+        through = Pizza.ingredients.through
+        through.objects.filter(pizza_id__in=pizza_ids).delete()
+        through.objects.bulk_create(
+            through(pizza_id=pizza_id, ingredient_id=ingredient_id)
+            for pizza_id in pizza_ids
+            for ingredient_id in sorted(ingredient_sets[pizza_id])
+        )
+
+    def refresh_derived_data(self) -> None:
+        if not any(self.changed_ids.values()):
+            return
+        # Explicit primary keys leave Postgres sequences behind
+        models = [model for model, _ in CATALOGUE_MODELS.values()]
+        with connection.cursor() as cursor:
+            for statement in connection.ops.sequence_reset_sql(
+                no_style(), models
+            ):
+                cursor.execute(statement)
+
+        pizza_ids = set(self.changed_ids["pizza.pizza"])
+        renamed_ingredients = self.changed_ids["pizza.ingredient"]
+        if renamed_ingredients:
+            pizza_ids.update(
+                Pizza.ingredients.through.objects.filter(
+                    ingredient_id__in=renamed_ingredients
+                ).values_list("pizza_id", flat=True)
+            )
+        backend = get_search_backend()
+        pizza_ids = sorted(pizza_ids)
+        for start in range(0, len(pizza_ids), self.batch_size):
+            pizzas = list(
+                Pizza.objects.filter(
+                    id__in=pizza_ids[start:start + self.batch_size]
+                )
+            )
+            backend.index(pizzas)
+            for pizza in pizzas:
+                invalidate_pizza_summary(pizza.id)
+                schedule_renditions(pizza)
+
+        PizzaSize.invalidate_size_table()
+        bump_catalogue_version()
+
+
+def import_catalogue(stream, batch_size=BATCH_SIZE, dry_run=False) -> dict:
+    """Upsert the fixture objects in ``stream``; returns the diff counts."""
+    return CatalogueImport(batch_size, dry_run).run(stream)
+
+
+def export_catalogue(stream, batch_size=BATCH_SIZE) -> int:
+    """
+    Write sizes, ingredient types, ingredients and the shared pizzas to
+    ``stream`` as a fixture, one object at a time. Returns the count.
+    """
+    count = 0
+    stream.write("[")
+    for label, (model, field_names) in CATALOGUE_MODELS.items():
+        fields = [model._meta.get_field(name) for name in field_names]
+        queryset = model.objects.order_by("pk")
+        if model is Pizza:
+            queryset = queryset.filter(user__isnull=True).prefetch_related(
+                "ingredients"
+            )
+        for obj in queryset.iterator(chunk_size=batch_size):
+            values = {
+                field.name: field.value_from_object(obj) for field in fields
+            }
+            if model is Pizza:
+                values["image"] = obj.image.name
+                values["ingredients"] = sorted(
+                    ingredient.id for ingredient in obj.ingredients.all()
+                )
+            stream.write("," if count else "")
+            stream.write(
+                "\n"
+                + json.dumps(
+                    {"model": label, "pk": obj.pk, "fields": values},
+                    indent=2,
+                )
+            )
+            count += 1
+    stream.write("\n]\n")
+    return count
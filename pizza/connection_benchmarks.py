@@ -0,0 +1,114 @@
+"""
+Per-request connection overhead under each connection reuse mode.
+
+Requests are replayed against a private copy of the ``default`` database
+settings: every request runs the connection bookkeeping Django does on
+``request_started`` and ``request_finished`` around a single query. On
+SQLite, where connecting is nearly free, ``connect_latency`` stands in
+for the TCP, TLS and authentication round trips of a remote server.
+"""
+import time
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+
+from pizza_mate.database import POOL_ENGINE, POSTGRESQL_ENGINE
+from pizza_mate.middleware import PERCENTILES, percentile
+
+CONNECTION_MODES = {
+    "none": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": False},
+    "persistent-checked": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+    "pool": {
+        "ENGINE": POOL_ENGINE,
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "POOL": {"min_size": 1, "max_size": 1},
+    },
+}
+
+
+def add_connect_latency(wrapper, latency) -> None:
+    # The pool backend opens its connections through open_connection()
+    name = (
+        "open_connection"
+        if hasattr(wrapper, "open_connection")
+        else "get_new_connection"
+    )
+    connect = getattr(wrapper, name)
+
+    def slow_connect(conn_params):
+        time.sleep(latency)
+        return connect(conn_params)
+
+    setattr(wrapper, name, slow_connect)
+
+
+def get_available_modes(settings_dict) -> list:
+    engine = settings_dict["ENGINE"]
+    return [
+        mode
+        for mode, overrides in CONNECTION_MODES.items()
+        if "ENGINE" not in overrides
+        or engine in (POSTGRESQL_ENGINE, POOL_ENGINE)
+    ]
+
+
+def open_wrapper(settings_dict, mode, connect_latency):
+    settings_dict = {**settings_dict, **CONNECTION_MODES[mode]}
+    backend = load_backend(settings_dict["ENGINE"])
+    wrapper = backend.DatabaseWrapper(settings_dict, f"benchmark-{mode}")
+    if connect_latency:
+        add_connect_latency(wrapper, connect_latency / 1000)
+    return wrapper
+
+
+def measure_mode(settings_dict, mode, requests, connect_latency=0) -> dict:
+    wrapper = open_wrapper(settings_dict, mode, connect_latency)
+    opened = []
+
+    def count_connection(sender, connection, **kwargs) -> None:
+        if connection is wrapper:
+            opened.append(connection)
+
+    connection_created.connect(count_connection, weak=False)
+    timings = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            wrapper.close_if_unusable_or_obsolete()
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            wrapper.close_if_unusable_or_obsolete()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection_created.disconnect(count_connection)
+        wrapper.close()
+
+    timings.sort()
+    return {
+        "connections": len(opened),
+        "latency_ms": {
+            f"p{percent}": round(percentile(timings, percent), 3)
+            for percent in PERCENTILES
+        },
+    }
+
+
+def run_connection_benchmark(
+    requests, connect_latency=0, settings_dict=None
+) -> dict:
+    """``settings_dict`` defaults to the ``default`` database's."""
+    if settings_dict is None:
+        settings_dict = connections["default"].settings_dict
+    return {
+        "engine": settings_dict["ENGINE"],
+        "requests": requests,
+        "connect_latency_ms": connect_latency,
+        "modes": {
+            mode: measure_mode(settings_dict, mode, requests, connect_latency)
+            for mode in get_available_modes(settings_dict)
+        },
+    }
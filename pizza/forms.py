@@ -1,20 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 
-from pizza.models import Ingredient, Pizza, CustomUser, IngredientType
-
-
-class PizzaForm(forms.ModelForm):
-    ingredients = forms.ModelMultipleChoiceField(
-        queryset=Ingredient.objects.all(),
-        widget=forms.CheckboxSelectMultiple(
-            attrs={"class": "checkbox-columns"}
-        ),
-    )
-
-    class Meta:
-        model = Pizza
-        fields = "__all__"
+from pizza.catalogue import get_catalogue
+from pizza.models import Pizza, CustomUser
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -37,13 +25,15 @@ class ProfileCustomUserForm(forms.ModelForm):
 class CustomPizzaCreateForm(forms.ModelForm):
     def __init__(self, *args, **kwargs) -> None:
         super(CustomPizzaCreateForm, self).__init__(*args, **kwargs)
-        for ingredient_type in IngredientType.objects.all():
+        for ingredient_type, ingredients in get_catalogue().get_type_groups():
             self.fields[
-                "ingredient_type.name"
-            ] = forms.ModelMultipleChoiceField(
-                queryset=Ingredient.objects.filter(
-                    ingredient_type=ingredient_type
-                ),
+                ingredient_type.name.lower().replace(" ", "_")
+            ] = forms.TypedMultipleChoiceField(
+                choices=[
+                    (ingredient.id, ingredient.name)
+                    for ingredient in ingredients
+                ],
+                coerce=int,
                 widget=forms.CheckboxSelectMultiple(
                     attrs={"class": "checkbox-columns"}
                 ),
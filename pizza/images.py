@@ -0,0 +1,214 @@
+import hashlib
+import json
+import posixpath
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from pizza.catalogue import bump_pizza_versions
+from pizza.models import Pizza
+from pizza.recalculation import invalidate_pizza_summary
+from pizza.task_queue import enqueue
+
+RENDITION_WIDTHS = (320, 640)
+RENDITION_DIR = "pizzas/renditions"
+# Most efficient first; formats this Pillow build cannot encode are skipped
+RENDITION_FORMATS = (
+    ("image/avif", "avif", "AVIF", {"quality": 60}),
+    ("image/webp", "webp", "WEBP", {"quality": 80, "method": 6}),
+    ("image/jpeg", "jpg", "JPEG", {"quality": 82, "optimize": True}),
+)
+FALLBACK_MIME_TYPE = "image/jpeg"
+IMAGE_SOURCES_KEY = "pizza:image-sources:{digest}"
+IMAGE_SOURCES_TIMEOUT = 60 * 60
+
+
+def get_rendition_formats() -> list:
+    Image.init()
+    return [
+        rendition_format
+        for rendition_format in RENDITION_FORMATS
+        if rendition_format[2] in Image.SAVE
+    ]
+
+
+def needs_renditions(pizza) -> bool:
+    return bool(pizza.image) and (
+        pizza.image_renditions.get("source") != pizza.image.name
+    )
+
+
+def get_content_digest(chunks) -> str:
+    digest = hashlib.md5()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+# Storages such as S3 overwrite an upload saved under an existing name,
+# so a new upload drops the renditions of whatever the name held before
+# and records the digest of its content instead
+def reset_uploaded_renditions(pizza) -> None:
+    if pizza.image and not pizza.image._committed:
+        pizza.image_renditions = {
+            "digest": get_content_digest(pizza.image.chunks())
+        }
+
+
+def get_stored_renditions(source, digest=None):
+    """
+    Renditions already stored for ``source`` on any pizza, or None.
+    With ``digest`` they must also come from that content.
+    """
+    pizzas = Pizza.objects.only("image_renditions").filter(
+        image=source, image_renditions__source=source
+    )
+    if digest is not None:
+        pizzas = pizzas.filter(image_renditions__digest=digest)
+    pizza = pizzas.first()
+    return None if pizza is None else pizza.image_renditions
+
+
+# Renditions belong to the source content, which many pizzas share: a
+# new pizza reuses stored ones, and only unseen content queues a worker
+# task. The task commits together with the new image
+def schedule_renditions(pizza) -> None:
+    if not needs_renditions(pizza):
+        return
+    source = pizza.image.name
+    digest = pizza.image_renditions.get("digest")
+    renditions = get_stored_renditions(source, digest)
+    if renditions is not None:
+        store_renditions(renditions)
+        pizza.image_renditions = renditions
+        return
+    enqueue(
+        "generate_renditions",
+        {"source": source, "digest": digest},
+        idempotency_key=f"renditions:{source}:{digest or ''}",
+    )
+
+
+def encode_rendition(image, image_format, options) -> bytes:
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def create_renditions(image_field, force=False) -> dict:
+    """
+    Resize ``image_field`` to every rendition width and format and save
+    the files next to the originals. Returns the ``image_renditions``
+    value: the source name, its content digest and, per MIME type,
+    ``[width, name]`` pairs.
+    Files are named by the source content and never deleted, as other
+    pizzas and cached pages may reference them; existing files are
+    reused unless ``force`` re-encodes them.
+    """
+    storage = image_field.storage
+    with image_field.open("rb") as image_file:
+        data = image_file.read()
+    digest = get_content_digest([data])
+    source = Image.open(BytesIO(data))
+    source.load()
+    source = ImageOps.exif_transpose(source)
+    if source.mode not in ("RGB", "RGBA"):
+        has_alpha = "transparency" in source.info or "A" in source.mode
+        source = source.convert("RGBA" if has_alpha else "RGB")
+
+    stem = posixpath.basename(image_field.name).replace(".", "-")
+    widths = sorted({min(width, source.width) for width in RENDITION_WIDTHS})
+    files = {}
+    for width in widths:
+        resized = source.copy()
+        resized.thumbnail((width, source.height), Image.LANCZOS)
+        for mime_type, extension, image_format, options in (
+            get_rendition_formats()
+        ):
+            name = f"{RENDITION_DIR}/{stem}-{digest}-{width}w.{extension}"
+            if force or not storage.exists(name):
+                name = storage.save(
+                    name,
+                    ContentFile(
+                        encode_rendition(resized, image_format, options)
+                    ),
+                )
+            files.setdefault(mime_type, []).append([resized.width, name])
+    return {"source": image_field.name, "digest": digest, "files": files}
+
+
+def generate_renditions(image_field, force=False, digest=None) -> int:
+    """
+    Store renditions of ``image_field`` on every pizza showing it,
+    creating them only if no pizza has them yet (or with ``force``).
+    ``digest``, when known, is the content they must come from. Returns
+    how many pizzas were updated.
+    """
+    renditions = None
+    if not force:
+        renditions = get_stored_renditions(image_field.name, digest)
+    if renditions is None:
+        renditions = create_renditions(image_field, force)
+    return store_renditions(renditions, force)
+
+
+def store_renditions(renditions, force=False) -> int:
+    # update() skips post_save, so storing never schedules another run;
+    # the image filter skips pizzas whose image was replaced meanwhile
+    source = renditions["source"]
+    digest = renditions["digest"]
+    pizzas = Pizza.objects.filter(image=source)
+    if not force:
+        # A missing key is NULL, which a plain exclude() would also skip
+        pizzas = pizzas.filter(
+            Q(image_renditions__source__isnull=True)
+            | ~Q(image_renditions__source=source)
+            | Q(image_renditions__digest__isnull=True)
+            | ~Q(image_renditions__digest=digest)
+        )
+    owners = dict(pizzas.values_list("id", "user_id"))
+    if not owners:
+        return 0
+    Pizza.objects.filter(id__in=owners).update(image_renditions=renditions)
+    for pizza_id in owners:
+        invalidate_pizza_summary(pizza_id)
+    bump_pizza_versions(owners.values())
+    return len(owners)
+
+
+def get_image_sources(pizza) -> dict:
+    """
+    URLs for a ``<picture>``: the original as ``src``, the JPEG renditions
+    as the ``<img>`` srcset and a ``<source>`` srcset per other format.
+    Cached by image content, so pizzas sharing an image (and
+    repeated renders) cost no storage URL building.
+    """
+    renditions = pizza.image_renditions
+    if renditions.get("source") != pizza.image.name:
+        renditions = {}
+    digest = hashlib.md5(
+        json.dumps([pizza.image.name, renditions], sort_keys=True).encode()
+    ).hexdigest()
+    cache_key = IMAGE_SOURCES_KEY.format(digest=digest)
+
+    sources = cache.get(cache_key)
+    if sources is None:
+        storage = pizza.image.storage
+        srcsets = {
+            mime_type: ", ".join(
+                f"{storage.url(name)} {width}w" for width, name in files
+            )
+            for mime_type, files in renditions.get("files", {}).items()
+        }
+        sources = {
+            "src": pizza.image.url,
+            "srcset": srcsets.pop(FALLBACK_MIME_TYPE, ""),
+            "sources": list(srcsets.items()),
+        }
+        cache.set(cache_key, sources, IMAGE_SOURCES_TIMEOUT)
+    return sources
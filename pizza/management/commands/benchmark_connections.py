@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from pizza.connection_benchmarks import run_connection_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request connection overhead with and without "
+        "persistent, health-checked and pooled connections"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--connect-latency",
+            type=float,
+            default=0,
+            help="Milliseconds added to every new connection, standing in "
+            "for the handshake with a remote server",
+        )
+        parser.add_argument("--output", help="JSON file, stdout by default")
+
+    def handle(self, *args, **options) -> None:
+        report = json.dumps(
+            run_connection_benchmark(
+                options["requests"], options["connect_latency"]
+            ),
+            indent=2,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
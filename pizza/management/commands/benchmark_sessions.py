@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from pizza.session_benchmarks import run_session_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare django_session writes and request latency of a login, "
+        "cart and checkout visit under each SESSION_MODE"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--visits", type=int, default=20)
+        parser.add_argument(
+            "--cart-requests",
+            type=int,
+            default=3,
+            help="Pizzas added to the cart during each visit",
+        )
+        parser.add_argument("--output", help="JSON file, stdout by default")
+
+    def handle(self, *args, **options) -> None:
+        report = json.dumps(
+            run_session_benchmark(
+                options["visits"], options["cart_requests"]
+            ),
+            indent=2,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
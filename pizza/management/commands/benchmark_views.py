@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pizza.benchmarks import find_query_growth, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every pizza route on a synthetic catalogue at two sizes "
+        "and fail if any view's query count grows with the data"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--pizzas", type=int, default=20)
+        parser.add_argument("--ingredients", type=int, default=30)
+        parser.add_argument("--orders", type=int, default=20)
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=5,
+            help="Multiplier applied to every count for the second run",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="JSON file, stdout by default")
+
+    def handle(self, *args, **options) -> None:
+        runs = [
+            run_benchmark(
+                options["pizzas"] * scale,
+                options["ingredients"] * scale,
+                options["orders"] * scale,
+                options["repeat"],
+            )
+            for scale in (1, options["scale"])
+        ]
+        regressions = find_query_growth(*runs)
+        report = json.dumps(
+            {"runs": runs, "regressions": regressions}, indent=2
+        )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+        if regressions:
+            raise CommandError(
+                "Query count grows with data size:\n" + "\n".join(regressions)
+            )
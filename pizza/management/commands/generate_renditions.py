@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from pizza.images import generate_renditions
+from pizza.models import Pizza
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG renditions for existing pizza images"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate renditions that are already up to date",
+        )
+
+    def handle(self, *args, **options) -> None:
+        # Many pizzas share the default image, so each file is resized once
+        generated = skipped = failed = 0
+        sources = (
+            Pizza.objects.exclude(image="")
+            .values("image")
+            .annotate(pizza_count=Count("id"))
+            .order_by("image")
+        )
+        for source in sources:
+            pizza = Pizza.objects.only("image").filter(
+                image=source["image"]
+            ).first()
+            try:
+                stored = generate_renditions(pizza.image, options["force"])
+            except (OSError, ValueError) as error:
+                failed += source["pizza_count"]
+                self.stderr.write(f"{source['image']}: {error}")
+                continue
+            generated += stored
+            skipped += source["pizza_count"] - stored
+
+        self.stdout.write(
+            f"Generated renditions for {generated} pizzas, "
+            f"skipped {skipped}, failed {failed}"
+        )
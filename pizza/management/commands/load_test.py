@@ -0,0 +1,115 @@
+import json
+import random
+import threading
+import time
+from urllib.error import URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from pizza.models import Pizza, PizzaSize
+from pizza_mate.middleware import PERCENTILES, percentile
+
+
+def get_browsing_paths() -> list:
+    """Menu pages, searches and size selections of the shared pizzas."""
+    pizzas = list(
+        Pizza.objects.filter(user__isnull=True).values_list("id", "name")[:50]
+    )
+    sizes = list(PizzaSize.get_multipliers())
+    menu_url = reverse("pizza:home-page")
+    paths = [menu_url]
+    for pizza_id, name in pizzas:
+        paths.append(f"{menu_url}?{urlencode({'search': name.split()[0]})}")
+        detail_url = reverse("pizza:pizza-detail", kwargs={"pk": pizza_id})
+        paths.extend(
+            f"{detail_url}?{urlencode({'size': size})}" for size in sizes
+        )
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent menu browsing against a running server and "
+        "report throughput and latency percentiles"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--url", default="http://127.0.0.1:8000/")
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Seconds"
+        )
+        parser.add_argument("--label", default="run")
+        parser.add_argument("--output", help="JSON file, stdout by default")
+        parser.add_argument(
+            "--baseline", help="Earlier JSON report to compare against"
+        )
+
+    def handle(self, *args, **options) -> None:
+        paths = get_browsing_paths()
+        deadline = time.perf_counter() + options["duration"]
+        lock = threading.Lock()
+        latencies = []
+        errors = []
+
+        def browse(seed) -> None:
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                url = urljoin(options["url"], rng.choice(paths))
+                start = time.perf_counter()
+                try:
+                    with urlopen(url, timeout=30) as response:
+                        response.read()
+                except (URLError, OSError) as error:
+                    with lock:
+                        errors.append(str(error))
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=browse, args=(seed,))
+            for seed in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if not latencies:
+            raise CommandError(
+                f"No successful requests to {options['url']}: "
+                f"{errors[0] if errors else 'nothing sent'}"
+            )
+        latencies.sort()
+        report = {
+            "label": options["label"],
+            "url": options["url"],
+            "concurrency": options["concurrency"],
+            "requests": len(latencies),
+            "errors": len(errors),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "latency_ms": {
+                f"p{percent}": round(percentile(latencies, percent), 3)
+                for percent in PERCENTILES
+            },
+        }
+        if options["baseline"]:
+            with open(options["baseline"]) as baseline_file:
+                baseline = json.load(baseline_file)
+            report["baseline"] = baseline["label"]
+            report["throughput_ratio"] = round(
+                report["throughput_rps"] / baseline["throughput_rps"], 2
+            )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                output_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,188 @@
+import csv
+import heapq
+import json
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from pizza.models import Order, OrderPizza
+
+REPORTS = ("daily", "top", "sizes")
+CSV_COLUMNS = ("report", "key", "orders", "quantity", "revenue")
+
+
+def format_revenue(value) -> str:
+    return str(Decimal(value or 0).quantize(Decimal("0.01")))
+
+
+def parse_date(value) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Daily revenue, top pizzas and size mix for a date range"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--from", dest="date_from", type=parse_date)
+        parser.add_argument("--to", dest="date_to", type=parse_date)
+        parser.add_argument(
+            "--report", choices=REPORTS, action="append", dest="reports"
+        )
+        parser.add_argument(
+            "--format", choices=("json", "csv"), default="json"
+        )
+        parser.add_argument("--output", help="File path, stdout by default")
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Aggregate in Python over chunked rows instead of GROUP BY",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options) -> None:
+        self.chunk_size = options["chunk_size"]
+        self.stream = options["stream"]
+        self.top = options["top"]
+        orders = self.filter_by_date(
+            Order.objects.all(), "order_date", options
+        )
+        lines = self.filter_by_date(
+            OrderPizza.objects.all(), "order__order_date", options
+        )
+
+        builders = {
+            "daily": lambda: self.get_daily_revenue(orders),
+            "top": lambda: self.get_top_pizzas(lines),
+            "sizes": lambda: self.get_size_mix(lines),
+        }
+        results = {
+            report: builders[report]()
+            for report in options["reports"] or REPORTS
+        }
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                self.write(results, options["format"], output)
+        else:
+            self.write(results, options["format"], self.stdout)
+
+    def filter_by_date(self, queryset, field, options):
+        # Compare against datetimes so the order_date index stays usable
+        if options["date_from"]:
+            start = datetime.combine(options["date_from"], time.min)
+            queryset = queryset.filter(
+                **{f"{field}__gte": timezone.make_aware(start)}
+            )
+        if options["date_to"]:
+            end = datetime.combine(options["date_to"] + timedelta(1), time.min)
+            queryset = queryset.filter(
+                **{f"{field}__lt": timezone.make_aware(end)}
+            )
+        return queryset
+
+    def get_daily_revenue(self, orders) -> list:
+        if self.stream:
+            totals = defaultdict(lambda: [0, Decimal(0)])
+            rows = orders.values_list("order_date", "total_price")
+            for order_date, total_price in rows.iterator(self.chunk_size):
+                day_totals = totals[timezone.localdate(order_date)]
+                day_totals[0] += 1
+                day_totals[1] += total_price
+            rows = [
+                (day, day_orders, revenue)
+                for day, (day_orders, revenue) in sorted(totals.items())
+            ]
+        else:
+            rows = (
+                orders.annotate(day=TruncDate("order_date"))
+                .values("day")
+                .annotate(orders=Count("id"), revenue=Sum("total_price"))
+                .order_by("day")
+                .values_list("day", "orders", "revenue")
+            )
+
+        return [
+            {
+                "key": day.isoformat(),
+                "orders": day_orders,
+                "revenue": format_revenue(revenue),
+            }
+            for day, day_orders, revenue in rows
+        ]
+
+    def get_top_pizzas(self, lines) -> list:
+        if self.stream:
+            totals = defaultdict(lambda: [0, Decimal(0)])
+            rows = lines.values_list("pizza_name", "quantity", "unit_price")
+            for name, quantity, unit_price in rows.iterator(self.chunk_size):
+                totals[name][0] += quantity
+                totals[name][1] += unit_price * quantity
+            rows = heapq.nlargest(
+                self.top,
+                ((name, *total) for name, total in totals.items()),
+                key=lambda row: (row[1], row[2]),
+            )
+        else:
+            rows = (
+                lines.values("pizza_name")
+                .annotate(
+                    total_quantity=Sum("quantity"),
+                    revenue=Sum(
+                        F("unit_price") * F("quantity"),
+                        output_field=DecimalField(),
+                    ),
+                )
+                .order_by("-total_quantity", "-revenue")
+                .values_list("pizza_name", "total_quantity", "revenue")
+            )[: self.top]
+
+        return [
+            {
+                "key": name,
+                "quantity": quantity,
+                "revenue": format_revenue(revenue),
+            }
+            for name, quantity, revenue in rows
+        ]
+
+    def get_size_mix(self, lines) -> list:
+        if self.stream:
+            totals = defaultdict(int)
+            rows = lines.values_list("size_name", "quantity")
+            for size_name, quantity in rows.iterator(self.chunk_size):
+                totals[size_name] += quantity
+            rows = sorted(totals.items())
+        else:
+            rows = (
+                lines.values("size_name")
+                .annotate(total_quantity=Sum("quantity"))
+                .order_by("size_name")
+                .values_list("size_name", "total_quantity")
+            )
+
+        return [
+            {"key": size_name or "unknown", "quantity": quantity}
+            for size_name, quantity in rows
+        ]
+
+    def write(self, results, output_format, output) -> None:
+        if output_format == "json":
+            output.write(json.dumps(results, indent=2) + "\n")
+            return
+
+        writer = csv.DictWriter(
+            output, fieldnames=CSV_COLUMNS, lineterminator="\n"
+        )
+        writer.writeheader()
+        for report, rows in results.items():
+            for row in rows:
+                writer.writerow({"report": report, **row})
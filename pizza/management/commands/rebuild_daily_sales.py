@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Sum
+from django.db.models.functions import TruncDate
+
+from pizza.management.commands.pizza_stats import parse_date
+from pizza.models import DailyPizzaSales, Order, OrderPizza
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyPizzaSales rollup from OrderPizza rows"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--from", dest="date_from", type=parse_date)
+        parser.add_argument("--to", dest="date_to", type=parse_date)
+
+    def handle(self, *args, **options) -> None:
+        rollup = DailyPizzaSales.objects.all()
+        lines = OrderPizza.objects.annotate(
+            day=TruncDate("order__order_date")
+        )
+        orders = Order.objects.annotate(day=TruncDate("order_date"))
+        if options["date_from"]:
+            rollup = rollup.filter(date__gte=options["date_from"])
+            lines = lines.filter(day__gte=options["date_from"])
+            orders = orders.filter(day__gte=options["date_from"])
+        if options["date_to"]:
+            rollup = rollup.filter(date__lte=options["date_to"])
+            lines = lines.filter(day__lte=options["date_to"])
+            orders = orders.filter(day__lte=options["date_to"])
+
+        rows = (
+            lines.values("day", "pizza_id", "size_name")
+            .annotate(
+                pizza_name=Max("pizza_name"),
+                orders=Count("order_id", distinct=True),
+                total_quantity=Sum("quantity"),
+                revenue=Sum(
+                    F("unit_price") * F("quantity"),
+                    output_field=DecimalField(),
+                ),
+            )
+            .order_by()
+        )
+
+        created = 0
+        with transaction.atomic():
+            deleted, _ = rollup.delete()
+            batch = []
+            for row in rows.iterator(chunk_size=BATCH_SIZE):
+                batch.append(
+                    DailyPizzaSales(
+                        date=row["day"],
+                        pizza_id=row["pizza_id"],
+                        pizza_name=row["pizza_name"],
+                        size_name=row["size_name"],
+                        orders=row["orders"],
+                        quantity=row["total_quantity"],
+                        revenue=row["revenue"],
+                    )
+                )
+                if len(batch) >= BATCH_SIZE:
+                    created += len(DailyPizzaSales.objects.bulk_create(batch))
+                    batch = []
+            created += len(DailyPizzaSales.objects.bulk_create(batch))
+            # Their queued record_order_sales tasks must not add them again
+            orders.filter(sales_recorded=False).update(sales_recorded=True)
+
+        self.stdout.write(
+            f"Replaced {deleted} daily sales rows with {created} rows"
+        )
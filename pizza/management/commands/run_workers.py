@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from pizza.task_queue import work
+from pizza.tasks import schedule_sweep
+
+
+def run_worker_process(worker_id, stop_event, poll_interval, burst) -> None:
+    # The parent turns Ctrl-C / SIGTERM into stop_event, so a worker
+    # always finishes its current task before exiting
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    work(worker_id, stop_event, poll_interval, burst)
+
+
+class Command(BaseCommand):
+    help = "Run background task workers against the database queue"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=getattr(settings, "TASK_WORKER_PROCESSES", 2),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=getattr(settings, "TASK_POLL_INTERVAL", 1.0),
+            help="Seconds to sleep when no task is due",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue has no due tasks",
+        )
+
+    def handle(self, *args, **options) -> None:
+        schedule_sweep()
+        worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        processes = max(options["processes"], 1)
+
+        if processes == 1:
+            stop_event = threading.Event()
+            self.handle_stop_signals(stop_event)
+            work(
+                f"{worker_prefix}:0",
+                stop_event,
+                options["poll_interval"],
+                options["burst"],
+            )
+            return
+
+        # Forked children must not share the parent's DB connection
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        stop_event = context.Event()
+        workers = [
+            context.Process(
+                target=run_worker_process,
+                args=(
+                    f"{worker_prefix}:{number}",
+                    stop_event,
+                    options["poll_interval"],
+                    options["burst"],
+                ),
+            )
+            for number in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.handle_stop_signals(stop_event)
+        self.stdout.write(f"Started {processes} task workers")
+        for worker in workers:
+            worker.join()
+
+    def handle_stop_signals(self, stop_event) -> None:
+        def stop(signum, frame) -> None:
+            self.stdout.write("Stopping task workers")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
@@ -0,0 +1,77 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pizza.catalogue import get_catalogue_cache_alias
+from pizza.catalogue_sync import (
+    BATCH_SIZE,
+    CatalogueSyncError,
+    export_catalogue,
+    import_catalogue,
+)
+from pizza_mate.caches import LOCAL_CACHE_TIMEOUT, is_shared_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Import or export sizes, ingredients and shared pizzas as a "
+        "streamed fixture such as ingredients.json, upserting in batches"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help='Fixture file, "-" for stdin/stdout')
+        parser.add_argument(
+            "--export",
+            action="store_true",
+            help="Write the catalogue to the path instead of importing it",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what an import would change without saving it",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options) -> None:
+        if options["export"]:
+            self.export(options["path"], options["batch_size"])
+        else:
+            self.import_(
+                options["path"], options["batch_size"], options["dry_run"]
+            )
+
+    def export(self, path, batch_size) -> None:
+        if path == "-":
+            export_catalogue(self.stdout, batch_size)
+            return
+        with open(path, "w") as output:
+            count = export_catalogue(output, batch_size)
+        self.stdout.write(f"Exported {count} objects to {path}")
+
+    def import_(self, path, batch_size, dry_run) -> None:
+        try:
+            if path == "-":
+                report = import_catalogue(sys.stdin, batch_size, dry_run)
+            else:
+                with open(path) as fixture:
+                    report = import_catalogue(fixture, batch_size, dry_run)
+        except (OSError, CatalogueSyncError) as error:
+            raise CommandError(error)
+
+        for label, counts in report.items():
+            self.stdout.write(
+                f"{label}: {counts['created']} created, "
+                f"{counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged"
+            )
+        if dry_run:
+            self.stdout.write("Dry run, nothing was saved")
+        elif not is_shared_cache(settings.CACHES[get_catalogue_cache_alias()]):
+            timeout = getattr(
+                settings, "LOCAL_CACHE_TIMEOUT", LOCAL_CACHE_TIMEOUT
+            )
+            self.stderr.write(
+                "No shared cache is configured (CACHE_URL): running "
+                f"servers see the changes within {timeout} seconds"
+            )
@@ -0,0 +1,64 @@
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from pizza.catalogue import get_catalogue_version
+
+MENU_PAGE_KEY = "pizza:menu-page:{version}:{page}"
+MENU_CARD_KEY = "pizza:menu-card:{version}:{pizza_id}"
+MENU_CACHE_STATS_KEY = "pizza:menu-cache-stats:{event}"
+MENU_CACHE_EVENTS = ("page_hits", "page_misses", "card_hits", "card_misses")
+MENU_CACHE_TIMEOUT = 60 * 60
+
+
+def record_menu_cache_event(event) -> None:
+    key = MENU_CACHE_STATS_KEY.format(event=event)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_menu_cache_stats() -> dict:
+    keys = {
+        event: MENU_CACHE_STATS_KEY.format(event=event)
+        for event in MENU_CACHE_EVENTS
+    }
+    counters = cache.get_many(keys.values())
+    return {event: counters.get(key, 0) for event, key in keys.items()}
+
+
+# ``page`` identifies the rendering: template, search query and cursor
+def get_menu_page_key(page) -> str:
+    page = hashlib.md5("\n".join(page).encode()).hexdigest()
+    return MENU_PAGE_KEY.format(version=get_catalogue_version(), page=page)
+
+
+def get_cached_menu_page(page):
+    content = cache.get(get_menu_page_key(page))
+    record_menu_cache_event("page_misses" if content is None else "page_hits")
+    return content
+
+
+def cache_menu_page(page, content) -> None:
+    cache.set(get_menu_page_key(page), content, MENU_CACHE_TIMEOUT)
+
+
+# Menu card HTML; shared cards are cached, custom pizzas render fresh
+def render_menu_card(pizza) -> str:
+    if pizza.user_id is not None:
+        return render_to_string("includes/menu_card.html", {"pizza": pizza})
+
+    cache_key = MENU_CARD_KEY.format(
+        version=get_catalogue_version(), pizza_id=pizza.id
+    )
+    content = cache.get(cache_key)
+    if content is None:
+        record_menu_cache_event("card_misses")
+        content = render_to_string("includes/menu_card.html", {"pizza": pizza})
+        cache.set(cache_key, content, MENU_CACHE_TIMEOUT)
+    else:
+        record_menu_cache_event("card_hits")
+    return content
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE pizza_pizzasearch USING fts5("
+    "name, description, ingredients, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO pizza_pizzasearch (rowid, name, description, ingredients) "
+    "SELECT p.id, p.name, p.description, COALESCE(("
+    "SELECT group_concat(i.name, ' ') FROM pizza_ingredient i "
+    "JOIN pizza_pizza_ingredients pi ON pi.ingredient_id = i.id "
+    "WHERE pi.pizza_id = p.id), '') FROM pizza_pizza p",
+]
+
+POSTGRES_CREATE = [
+    "CREATE TABLE pizza_pizzasearch ("
+    "pizza_id bigint PRIMARY KEY REFERENCES pizza_pizza (id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX pizza_pizzasearch_document_gin "
+    "ON pizza_pizzasearch USING GIN (document)",
+    "INSERT INTO pizza_pizzasearch (pizza_id, document) "
+    "SELECT p.id, "
+    "setweight(to_tsvector('simple', p.name), 'A') || "
+    "setweight(to_tsvector('simple', p.description), 'C') || "
+    "setweight(to_tsvector('simple', COALESCE(("
+    "SELECT string_agg(i.name, ' ') FROM pizza_ingredient i "
+    "JOIN pizza_pizza_ingredients pi ON pi.ingredient_id = i.id "
+    "WHERE pi.pizza_id = p.id), '')), 'B') FROM pizza_pizza p",
+]
+
+CREATE_STATEMENTS = {
+    "sqlite": SQLITE_CREATE,
+    "postgresql": POSTGRES_CREATE,
+}
+
+
+def create_search_index(apps, schema_editor) -> None:
+    vendor = schema_editor.connection.vendor
+    for statement in CREATE_STATEMENTS.get(vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor in CREATE_STATEMENTS:
+        schema_editor.execute("DROP TABLE pizza_pizzasearch")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0004_ingredienttype_alter_pizzasize_multiplier_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.5 on 2026-10-18 15:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0005_pizza_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="pizza",
+            options={"ordering": ["id"]},
+        ),
+        migrations.AlterField(
+            model_name="pizza",
+            name="image",
+            field=models.ImageField(
+                default="pizzas/default_pizza.jpg", upload_to="pizzas/"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pizza",
+            name="size",
+            field=models.ForeignKey(
+                default="2",
+                on_delete=django.db.models.deletion.CASCADE,
+                to="pizza.pizzasize",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "order_date", "id"],
+                name="order_customer_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+BATCH_SIZE = 500
+SNAPSHOT_FIELDS = ["pizza_name", "size", "size_name", "unit_price"]
+
+
+# Orders placed before the cart held exactly one line, so their unit price
+# is the order total divided by quantity and the size is the one whose
+# price matches. Anything else falls back to the pizza's current price.
+def backfill_snapshot(apps, schema_editor) -> None:
+    OrderPizza = apps.get_model("pizza", "OrderPizza")
+    PizzaSize = apps.get_model("pizza", "PizzaSize")
+
+    sizes = list(PizzaSize.objects.all())
+    line_counts = dict(
+        OrderPizza.objects.values("order_id")
+        .annotate(lines=Count("id"))
+        .values_list("order_id", "lines")
+    )
+
+    batch = []
+    lines = OrderPizza.objects.select_related("order", "pizza")
+    for line in lines.iterator(chunk_size=BATCH_SIZE):
+        pizza = line.pizza
+        unit_price = Decimal(pizza.base_price)
+        size = None
+        if line_counts[line.order_id] == 1 and line.quantity:
+            unit_price = line.order.total_price / line.quantity
+            size = next(
+                (
+                    size
+                    for size in sizes
+                    if round(pizza.base_price * size.multiplier) == unit_price
+                ),
+                None,
+            )
+
+        line.pizza_name = pizza.name
+        line.unit_price = unit_price.quantize(Decimal("0.01"))
+        line.size = size
+        line.size_name = size.name if size else ""
+        batch.append(line)
+        if len(batch) >= BATCH_SIZE:
+            OrderPizza.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+            batch = []
+
+    if batch:
+        OrderPizza.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0006_order_customer_date_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderpizza",
+            name="pizza_name",
+            field=models.CharField(blank=True, max_length=63),
+        ),
+        migrations.AddField(
+            model_name="orderpizza",
+            name="size",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="pizza.pizzasize",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderpizza",
+            name="size_name",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name="orderpizza",
+            name="unit_price",
+            field=models.DecimalField(
+                decimal_places=2, max_digits=7, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderpizza",
+            name="ingredient_deltas",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_snapshot, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="orderpizza",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, max_digits=7),
+        ),
+    ]
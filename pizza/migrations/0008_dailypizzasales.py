@@ -0,0 +1,56 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0007_orderpizza_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyPizzaSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("pizza_name", models.CharField(max_length=63)),
+                ("size_name", models.CharField(blank=True, max_length=50)),
+                ("orders", models.PositiveIntegerField(default=0)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12
+                    ),
+                ),
+                (
+                    "pizza",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="pizza.pizza",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily pizza sales",
+                "ordering": ["-date", "pizza_name", "size_name"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailypizzasales",
+            constraint=models.UniqueConstraint(
+                fields=("date", "pizza", "size_name"),
+                name="unique_daily_pizza_size_sales",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0008_dailypizzasales"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pizza",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
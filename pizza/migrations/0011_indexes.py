@@ -0,0 +1,77 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+# icontains compiles to UPPER(column) LIKE UPPER(%s) on Postgres, so the
+# trigram indexes are built over the same expression
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX pizza_name_trgm_idx ON pizza_pizza "
+    "USING GIN (UPPER(name) gin_trgm_ops)",
+    "CREATE INDEX ingredient_name_trgm_idx ON pizza_ingredient "
+    "USING GIN (UPPER(name) gin_trgm_ops)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS pizza_name_trgm_idx",
+    "DROP INDEX IF EXISTS ingredient_name_trgm_idx",
+]
+
+
+def create_trigram_indexes(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor == "postgresql":
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor == "postgresql":
+        for statement in POSTGRES_DROP:
+            schema_editor.execute(statement)
+
+
+def merge_duplicate_lines(apps, schema_editor) -> None:
+    OrderPizza = apps.get_model("pizza", "OrderPizza")
+    lines = {}
+    for line in OrderPizza.objects.order_by("id").iterator():
+        deltas = dict(sorted(line.ingredient_deltas.items()))
+        key = (line.order_id, line.pizza_id, line.size_name, str(deltas))
+        kept = lines.get(key)
+        if kept is None:
+            line.ingredient_deltas = deltas
+            line.save(update_fields=["ingredient_deltas"])
+            lines[key] = line
+        else:
+            kept.quantity += line.quantity
+            kept.save(update_fields=["quantity"])
+            line.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0010_task"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(fields=["name"], name="ingredient_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pizza",
+            index=models.Index(
+                condition=models.Q(("user__isnull", True)),
+                fields=["id"],
+                name="pizza_shared_menu_idx",
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="orderpizza",
+            constraint=models.UniqueConstraint(
+                fields=("order", "pizza", "size_name", "ingredient_deltas"),
+                name="unique_order_pizza_line",
+            ),
+        ),
+    ]
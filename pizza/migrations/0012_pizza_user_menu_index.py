@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0011_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pizza",
+            index=models.Index(
+                fields=["user", "id"], name="pizza_user_menu_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0012_pizza_user_menu_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["order_date", "id"], name="order_date_idx"
+            ),
+        ),
+    ]
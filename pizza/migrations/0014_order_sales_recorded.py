@@ -0,0 +1,37 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+# Existing orders are already in DailyPizzaSales, except those whose
+# record_order_sales task has not finished (a failed task rolled back)
+def mark_recorded_orders(apps, schema_editor) -> None:
+    Order = apps.get_model("pizza", "Order")
+    Task = apps.get_model("pizza", "Task")
+
+    pending = {
+        payload.get("order_id")
+        for payload in Task.objects.filter(name="record_order_sales")
+        .exclude(status="done")
+        .values_list("payload", flat=True)
+    }
+    Order.objects.exclude(id__in=pending - {None}).update(
+        sales_recorded=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pizza", "0013_order_date_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="sales_recorded",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(
+            mark_recorded_orders, migrations.RunPython.noop
+        ),
+    ]
@@ -1,5 +1,10 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
+from django.db.models.query import ModelIterable
+from django.utils import timezone
+
+from pizza_mate.caches import get_invalidation_timeout
 
 
 class CustomUser(AbstractUser):
@@ -11,10 +16,54 @@ class CustomUser(AbstractUser):
 
 
 class PizzaSize(models.Model):
+    SIZE_TABLE_CACHE_KEY = "pizza:size-table:{version}"
+    SIZE_TABLE_TIMEOUT = 60 * 60 * 24
+
     name = models.CharField(max_length=50)
     weight = models.IntegerField(default=0)
     multiplier = models.FloatField()
 
+    # Keyed by the catalogue version, which every size change bumps, so
+    # a change made in another process is picked up as well
+    @classmethod
+    def get_size_table_key(cls) -> str:
+        from pizza.catalogue import get_catalogue_version
+
+        return cls.SIZE_TABLE_CACHE_KEY.format(
+            version=get_catalogue_version()
+        )
+
+    @classmethod
+    def get_size_table(cls) -> list:
+        cache_key = cls.get_size_table_key()
+        sizes = cache.get(cache_key)
+        if sizes is None:
+            sizes = list(
+                cls.objects.order_by("id").values_list(
+                    "id", "name", "multiplier"
+                )
+            )
+            cache.set(
+                cache_key,
+                sizes,
+                get_invalidation_timeout("default", cls.SIZE_TABLE_TIMEOUT),
+            )
+        return sizes
+
+    @classmethod
+    def get_multipliers(cls) -> dict:
+        return {
+            name: multiplier for _, name, multiplier in cls.get_size_table()
+        }
+
+    @classmethod
+    def get_size_ids(cls) -> dict:
+        return {name: size_id for size_id, name, _ in cls.get_size_table()}
+
+    @classmethod
+    def invalidate_size_table(cls) -> None:
+        cache.delete(cls.get_size_table_key())
+
     def __str__(self) -> str:
         return self.name
 
@@ -35,11 +84,31 @@ class Ingredient(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name"], name="ingredient_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
 
+class PricedPizzaIterable(ModelIterable):
+    # Attach the per-size price dict while rows are being fetched,
+    # so the size table is read once for the whole queryset
+    def __iter__(self):
+        multipliers = PizzaSize.get_multipliers()
+        for pizza in super().__iter__():
+            pizza.prices = pizza.get_prices(multipliers)
+            yield pizza
+
+
+class PizzaQuerySet(models.QuerySet):
+    def with_prices(self) -> "PizzaQuerySet":
+        queryset = self._chain()
+        queryset._iterable_class = PricedPizzaIterable
+        return queryset
+
+
 class Pizza(models.Model):
     name = models.CharField(max_length=63)
     description = models.TextField()
@@ -49,6 +118,9 @@ class Pizza(models.Model):
     image = models.ImageField(
         upload_to="pizzas/", default="pizzas/default_pizza.jpg"
     )
+    image_renditions = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
     user = models.ForeignKey(
         CustomUser,
         on_delete=models.SET_NULL,
@@ -56,11 +128,14 @@ class Pizza(models.Model):
         blank=True,
     )
 
-    def get_prices(self) -> dict:
-        sizes = PizzaSize.objects.all()
+    objects = PizzaQuerySet.as_manager()
+
+    def get_prices(self, multipliers: dict = None) -> dict:
+        if multipliers is None:
+            multipliers = PizzaSize.get_multipliers()
         return {
-            size.name: round(self.base_price * size.multiplier)
-            for size in sizes
+            name: round(self.base_price * multiplier)
+            for name, multiplier in multipliers.items()
         }
 
     def __str__(self) -> str:
@@ -68,6 +143,16 @@ class Pizza(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            # The anonymous menu: shared pizzas in id order
+            models.Index(
+                fields=["id"],
+                condition=models.Q(user__isnull=True),
+                name="pizza_shared_menu_idx",
+            ),
+            # A user's own pizzas in id order, for the same menu pages
+            models.Index(fields=["user", "id"], name="pizza_user_menu_idx"),
+        ]
 
 
 class Order(models.Model):
@@ -75,6 +160,18 @@ class Order(models.Model):
     order_date = models.DateTimeField(auto_now_add=True)
     total_price = models.DecimalField(max_digits=7, decimal_places=2)
     pizzas = models.ManyToManyField(Pizza, through="OrderPizza")
+    # Set once the order is counted in DailyPizzaSales
+    sales_recorded = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["customer", "order_date", "id"],
+                name="order_customer_date_idx",
+            ),
+            # Admin changelist ordering and date hierarchy drill-down
+            models.Index(fields=["order_date", "id"], name="order_date_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Order {self.id} by {self.customer.username}"
@@ -85,5 +182,89 @@ class OrderPizza(models.Model):
     pizza = models.ForeignKey(Pizza, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
 
+    # Snapshot of what was sold, unaffected by later catalogue edits
+    pizza_name = models.CharField(max_length=63, blank=True)
+    size = models.ForeignKey(
+        PizzaSize, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    size_name = models.CharField(max_length=50, blank=True)
+    unit_price = models.DecimalField(max_digits=7, decimal_places=2)
+    ingredient_deltas = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        constraints = [
+            # One row per distinct line; the same pizza may still be
+            # ordered in several sizes or with different ingredients
+            models.UniqueConstraint(
+                fields=["order", "pizza", "size_name", "ingredient_deltas"],
+                name="unique_order_pizza_line",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.quantity} of {self.pizza.name} in order {self.order.id}"
+
+
+class DailyPizzaSales(models.Model):
+    date = models.DateField()
+    pizza = models.ForeignKey(Pizza, on_delete=models.CASCADE)
+    pizza_name = models.CharField(max_length=63)
+    size_name = models.CharField(max_length=50, blank=True)
+    orders = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-date", "pizza_name", "size_name"]
+        verbose_name_plural = "daily pizza sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "pizza", "size_name"],
+                name="unique_daily_pizza_size_sales",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.pizza_name} ({self.size_name}) on {self.date}"
+
+
+class Task(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(
+        max_length=255, unique=True, null=True, blank=True
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"],
+                name="task_status_run_after_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.id} ({self.status})"
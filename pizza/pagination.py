@@ -0,0 +1,174 @@
+import json
+from heapq import merge
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+# Model field behind an ordering name; None for annotations such as a
+# search rank, whose values are stored in the cursor as they are
+def get_ordering_field(model, name):
+    try:
+        return model._meta.get_field(name.lstrip("-"))
+    except FieldDoesNotExist:
+        return None
+
+
+def encode_cursor(obj, ordering) -> str:
+    values = []
+    for name in ordering:
+        field = get_ordering_field(obj, name)
+        if field is None:
+            values.append(getattr(obj, name.lstrip("-")))
+        else:
+            values.append(field.value_to_string(obj))
+    return urlsafe_base64_encode(json.dumps(values).encode())
+
+
+# Rows strictly after the cursor row in the given ordering
+def get_cursor_filter(model, ordering, cursor) -> Q:
+    values = json.loads(urlsafe_base64_decode(cursor))
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValueError("Malformed cursor")
+
+    condition = Q()
+    equal = {}
+    for name, value in zip(ordering, values):
+        field_name = name.lstrip("-")
+        field = get_ordering_field(model, name)
+        if field is not None:
+            value = field.to_python(value)
+        lookup = "lt" if name.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{field_name}__{lookup}": value})
+        equal[field_name] = value
+    return condition
+
+
+def get_page_queryset(queryset: QuerySet, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        try:
+            queryset = queryset.filter(
+                get_cursor_filter(queryset.model, ordering, cursor)
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404("Invalid page cursor")
+    # One extra row tells whether another page follows
+    return queryset[: page_size + 1]
+
+
+def split_page(objects, ordering, page_size) -> tuple:
+    next_cursor = None
+    if len(objects) > page_size:
+        objects = objects[:page_size]
+        next_cursor = encode_cursor(objects[-1], ordering)
+    return objects, next_cursor
+
+
+def paginate_by_keyset(
+    queryset: QuerySet, ordering, cursor, page_size
+) -> tuple:
+    """
+    Page of objects after ``cursor`` and the cursor of the next page.
+    ``ordering`` must end with a unique field so rows never tie.
+    """
+    objects = list(get_page_queryset(queryset, ordering, cursor, page_size))
+    return split_page(objects, ordering, page_size)
+
+
+async def apaginate_by_keyset(
+    queryset: QuerySet, ordering, cursor, page_size
+) -> tuple:
+    page = get_page_queryset(queryset, ordering, cursor, page_size)
+    return split_page([obj async for obj in page], ordering, page_size)
+
+
+def merge_pages(pages, ordering, page_size) -> tuple:
+    objects = list(merge(*pages, key=attrgetter(*ordering)))
+    return split_page(objects[: page_size + 1], ordering, page_size)
+
+
+def paginate_union_by_keyset(
+    querysets, ordering, cursor, page_size
+) -> tuple:
+    """
+    Like ``paginate_by_keyset`` for the union of disjoint querysets:
+    each is read up to one page and the results are merged, so every
+    query can stop early on its own index. ``ordering`` must be ascending
+    model fields.
+    """
+    pages = [
+        list(get_page_queryset(queryset, ordering, cursor, page_size))
+        for queryset in querysets
+    ]
+    return merge_pages(pages, ordering, page_size)
+
+
+async def apaginate_union_by_keyset(
+    querysets, ordering, cursor, page_size
+) -> tuple:
+    pages = [
+        [
+            obj
+            async for obj in get_page_queryset(
+                queryset, ordering, cursor, page_size
+            )
+        ]
+        for queryset in querysets
+    ]
+    return merge_pages(pages, ordering, page_size)
+
+
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 100_000
+
+
+def get_table_estimate(queryset) -> int:
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+def get_plan_estimate(queryset) -> int:
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over large PostgreSQL tables. Once
+    the planner's statistics put a table above
+    ``ESTIMATED_COUNT_THRESHOLD`` rows, the count is the statistics
+    estimate (unfiltered) or the query plan's row estimate (filtered)
+    instead of a full COUNT(*). Other backends count exactly.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if (
+            not isinstance(queryset, QuerySet)
+            or connections[queryset.db].vendor != "postgresql"
+        ):
+            return super().count
+        estimate = get_table_estimate(queryset)
+        if estimate <= ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        if queryset.query.where:
+            return get_plan_estimate(queryset)
+        return estimate
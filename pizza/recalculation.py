@@ -0,0 +1,185 @@
+"""
+The main logic that calculates changes in the number of ingredients
+that the client changes
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, QuerySet
+from django.http import Http404
+
+from pizza.catalogue import get_catalogue
+from pizza.models import Pizza
+from pizza_mate.caches import get_invalidation_timeout
+
+PIZZA_SUMMARY_KEY = "pizza:summary:{pizza_id}"
+PIZZA_SUMMARY_TIMEOUT = 60 * 60
+PRICE_PAYLOAD_KEY = "pizza:price-payload:{version}:{pizza_id}"
+PRICE_PAYLOAD_TIMEOUT = 60 * 60
+INGREDIENT_PRICE = 10
+
+
+# Price change if ingredients are added or removed. Mirrored in
+# static/js/pizza_prices.js, which applies it in the browser
+def get_updated_pizza_prices(pizza_prices, price_difference) -> dict:
+    if price_difference != 0:
+        return {
+            key: price + price_difference * INGREDIENT_PRICE
+            for key, price in pizza_prices.items()
+        }
+    return pizza_prices
+
+
+# Deleted on every change to the pizza, which only reaches other
+# processes through a shared cache
+def get_summary_timeout():
+    return get_invalidation_timeout("default", PIZZA_SUMMARY_TIMEOUT)
+
+
+# Pizza with its base ingredient count, cached until the pizza changes
+def get_pizza_summary(pizza_id) -> Pizza:
+    cache_key = PIZZA_SUMMARY_KEY.format(pizza_id=pizza_id)
+    pizza = cache.get(cache_key)
+    if pizza is None:
+        pizza = get_summary_queryset(pizza_id).first()
+        if pizza is None:
+            raise Http404("No pizza found matching the query")
+        cache.set(cache_key, pizza, get_summary_timeout())
+    return pizza
+
+
+async def aget_pizza_summary(pizza_id) -> Pizza:
+    cache_key = PIZZA_SUMMARY_KEY.format(pizza_id=pizza_id)
+    pizza = await cache.aget(cache_key)
+    if pizza is None:
+        pizza = await get_summary_queryset(pizza_id).afirst()
+        if pizza is None:
+            raise Http404("No pizza found matching the query")
+        await cache.aset(cache_key, pizza, get_summary_timeout())
+    return pizza
+
+
+def get_summary_queryset(pizza_id) -> QuerySet["Pizza"]:
+    return Pizza.objects.annotate(
+        ingredient_count=Count("ingredients")
+    ).filter(id=pizza_id)
+
+
+def invalidate_pizza_summary(pizza_id) -> None:
+    cache.delete(PIZZA_SUMMARY_KEY.format(pizza_id=pizza_id))
+
+
+# Validated quantities of the selected ingredients, keyed by ingredient
+def get_ingredient_quantities(selected_ingredients, data) -> dict:
+    quantities = {}
+    for ingredient in get_catalogue().get_ingredients(selected_ingredients):
+        quantity = data.get(f"ingredient_qty_{ingredient.id}", 1)
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Invalid quantity for {ingredient}")
+        if quantity < 1:
+            raise ValidationError(f"Invalid quantity for {ingredient}")
+        quantities[ingredient] = quantity
+    return quantities
+
+
+# Price of one pizza of the given size, optionally with custom ingredients.
+# The pizza must carry the ingredient_count annotation
+def get_unit_price(pizza, size, ingredients=None, multipliers=None) -> int:
+    prices = pizza.get_prices(multipliers)
+    if ingredients is not None:
+        price_difference = sum(ingredients.values()) - pizza.ingredient_count
+        prices = get_updated_pizza_prices(prices, price_difference)
+    return prices[size]
+
+
+# Ordered quantities relative to the base recipe, keyed by ingredient id
+def get_ingredient_deltas(base_ingredient_ids, ingredients) -> dict:
+    if ingredients is None:
+        return {}
+
+    deltas = {
+        str(ingredient_id): -1
+        for ingredient_id in base_ingredient_ids
+    }
+    for ingredient, quantity in ingredients.items():
+        delta = quantity - int(ingredient.id in base_ingredient_ids)
+        if delta:
+            deltas[str(ingredient.id)] = delta
+        else:
+            deltas.pop(str(ingredient.id), None)
+    # Sorted keys store equal deltas as equal JSON text on every backend
+    return dict(sorted(deltas.items()))
+
+
+def recalculate_pizza(pizza_id, pizza_size, data) -> dict:
+    return build_recalculated_context(
+        get_pizza_summary(pizza_id), pizza_size, data
+    )
+
+
+async def arecalculate_pizza(pizza_id, pizza_size, data) -> dict:
+    pizza = await aget_pizza_summary(pizza_id)
+    # Catalogue and size table reads are cache-first sync helpers
+    return await sync_to_async(build_recalculated_context)(
+        pizza, pizza_size, data
+    )
+
+
+def build_recalculated_context(pizza, pizza_size, data) -> dict:
+    quantities = get_ingredient_quantities(data.getlist("ingredients"), data)
+
+    price_difference = sum(quantities.values()) - pizza.ingredient_count
+    updated_ingredients = [
+        {"ingredient": ingredient, "quantity": quantity}
+        for ingredient, quantity in sorted(
+            quantities.items(), key=lambda item: item[0].name
+        )
+    ]
+
+    return {
+        "pizza": pizza,
+        "updated_ingredients": updated_ingredients,
+        "pizza_size": pizza_size,
+        "pizza_prices": get_updated_pizza_prices(
+            pizza.get_prices(), price_difference
+        ),
+    }
+
+
+def get_price_payload(pizza_id, version) -> dict:
+    """
+    Per-size prices, base ingredients and the ingredient catalogue the
+    detail page needs to price ingredient changes client-side.
+    """
+    cache_key = PRICE_PAYLOAD_KEY.format(version=version, pizza_id=pizza_id)
+    payload = cache.get(cache_key)
+    if payload is None:
+        pizza = get_pizza_summary(pizza_id)
+        base_ingredient_ids = Pizza.ingredients.through.objects.filter(
+            pizza_id=pizza.id
+        ).values_list("ingredient_id", flat=True)
+        payload = {
+            "pizza": {
+                "id": pizza.id,
+                "name": pizza.name,
+                "ingredients": sorted(base_ingredient_ids),
+            },
+            "prices": pizza.get_prices(),
+            "ingredient_price": INGREDIENT_PRICE,
+            "ingredient_types": [
+                {
+                    "name": ingredient_type.name,
+                    "ingredients": [
+                        {"id": ingredient.id, "name": ingredient.name}
+                        for ingredient in ingredients
+                    ],
+                }
+                for ingredient_type, ingredients in (
+                    get_catalogue().get_type_groups()
+                )
+            ],
+        }
+        cache.set(cache_key, payload, PRICE_PAYLOAD_TIMEOUT)
+    return payload
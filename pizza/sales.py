@@ -0,0 +1,63 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from pizza.models import DailyPizzaSales
+
+
+# Totals per (pizza, size) for the lines of one order. An order with
+# several lines for the same pizza and size still counts once
+def get_sales_totals(order_pizzas) -> dict:
+    totals = {}
+    for order_pizza in order_pizzas:
+        key = (order_pizza.pizza_id, order_pizza.size_name)
+        name, orders, quantity, revenue = totals.get(
+            key, (order_pizza.pizza_name, 1, 0, 0)
+        )
+        totals[key] = (
+            name,
+            orders,
+            quantity + order_pizza.quantity,
+            revenue + order_pizza.unit_price * order_pizza.quantity,
+        )
+    return totals
+
+
+def increment_daily_sales(
+    day, pizza_id, size_name, orders, quantity, revenue
+) -> int:
+    return DailyPizzaSales.objects.filter(
+        date=day, pizza_id=pizza_id, size_name=size_name
+    ).update(
+        orders=F("orders") + orders,
+        quantity=F("quantity") + quantity,
+        revenue=F("revenue") + revenue,
+    )
+
+
+# Runs once per order, in the record_order_sales task transaction
+def record_daily_sales(order, order_pizzas) -> None:
+    day = timezone.localdate(order.order_date)
+    for (pizza_id, size_name), (name, orders, quantity, revenue) in (
+        get_sales_totals(order_pizzas).items()
+    ):
+        if increment_daily_sales(
+            day, pizza_id, size_name, orders, quantity, revenue
+        ):
+            continue
+        try:
+            with transaction.atomic():
+                DailyPizzaSales.objects.create(
+                    date=day,
+                    pizza_id=pizza_id,
+                    pizza_name=name,
+                    size_name=size_name,
+                    orders=orders,
+                    quantity=quantity,
+                    revenue=revenue,
+                )
+        except IntegrityError:
+            # Another checkout created today's row first
+            increment_daily_sales(
+                day, pizza_id, size_name, orders, quantity, revenue
+            )
@@ -0,0 +1,194 @@
+"""
+Full-text menu search over pizza names, descriptions and ingredient names.
+
+The inverted index lives in the ``pizza_pizzasearch`` table created by
+migration 0005: an FTS5 virtual table on SQLite and a tsvector column with
+a GIN index on Postgres. Signals in ``pizza.signals`` keep it up to date.
+"""
+import re
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from pizza.models import Pizza
+
+SEARCH_TABLE = "pizza_pizzasearch"
+
+
+def get_search_terms(search_query: str) -> list:
+    return re.findall(r"\w+", search_query.lower())
+
+
+def get_ingredient_names(pizzas: Iterable[Pizza]) -> dict:
+    through = Pizza.ingredients.through
+    rows = through.objects.filter(
+        pizza_id__in=[pizza.id for pizza in pizzas]
+    ).values_list("pizza_id", "ingredient__name")
+    names = {}
+    for pizza_id, ingredient_name in rows:
+        names.setdefault(pizza_id, []).append(ingredient_name)
+    return {
+        pizza_id: " ".join(ingredient_names)
+        for pizza_id, ingredient_names in names.items()
+    }
+
+
+class SearchBackend:
+    def index(self, pizzas: Iterable[Pizza]) -> None:
+        pass
+
+    def remove(self, pizza_id: int) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        self.index(Pizza.objects.all())
+
+    def search(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        ingredient_pizzas = Pizza.ingredients.through.objects.filter(
+            ingredient__name__icontains=search_query
+        ).values("pizza_id")
+        return queryset.filter(
+            Q(name__icontains=search_query)
+            | Q(description__icontains=search_query)
+            | Q(id__in=ingredient_pizzas)
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    # Column weights for bm25(): name, description, ingredients
+    RANK = f"bm25({SEARCH_TABLE}, 10.0, 1.0, 5.0)"
+
+    def index(self, pizzas: Iterable[Pizza]) -> None:
+        pizzas = list(pizzas)
+        ingredient_names = get_ingredient_names(pizzas)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                [(pizza.id,) for pizza in pizzas],
+            )
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} "
+                f"(rowid, name, description, ingredients) "
+                f"VALUES (%s, %s, %s, %s)",
+                [
+                    (
+                        pizza.id,
+                        pizza.name,
+                        pizza.description,
+                        ingredient_names.get(pizza.id, ""),
+                    )
+                    for pizza in pizzas
+                ],
+            )
+
+    def remove(self, pizza_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [pizza_id]
+            )
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        super().rebuild()
+
+    def search(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        terms = get_search_terms(search_query)
+        if not terms:
+            return queryset.none()
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        matched_ids = RawSQL(
+            f"SELECT rowid FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s",
+            (match,),
+        )
+        rank = RawSQL(
+            f"SELECT {self.RANK} FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s "
+            f"AND rowid = {Pizza._meta.db_table}.id",
+            (match,),
+        )
+        return (
+            queryset.filter(id__in=matched_ids)
+            .annotate(search_rank=rank)
+            .order_by("search_rank", "id")
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    DOCUMENT = (
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'C') || "
+        "setweight(to_tsvector('simple', %s), 'B')"
+    )
+
+    def index(self, pizzas: Iterable[Pizza]) -> None:
+        pizzas = list(pizzas)
+        ingredient_names = get_ingredient_names(pizzas)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (pizza_id, document) "
+                f"VALUES (%s, {self.DOCUMENT}) "
+                f"ON CONFLICT (pizza_id) "
+                f"DO UPDATE SET document = EXCLUDED.document",
+                [
+                    (
+                        pizza.id,
+                        pizza.name,
+                        pizza.description,
+                        ingredient_names.get(pizza.id, ""),
+                    )
+                    for pizza in pizzas
+                ],
+            )
+
+    def remove(self, pizza_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE pizza_id = %s", [pizza_id]
+            )
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        super().rebuild()
+
+    def search(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        terms = get_search_terms(search_query)
+        if not terms:
+            return queryset.none()
+
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        matched_ids = RawSQL(
+            f"SELECT pizza_id FROM {SEARCH_TABLE} "
+            f"WHERE document @@ to_tsquery('simple', %s)",
+            (tsquery,),
+        )
+        # ts_rank() is a float4; cursors carry the rank as a Python
+        # float, which only compares equal to the stored value as float8
+        rank = RawSQL(
+            f"SELECT ts_rank(document, to_tsquery('simple', %s))"
+            f"::double precision "
+            f"FROM {SEARCH_TABLE} "
+            f"WHERE pizza_id = {Pizza._meta.db_table}.id",
+            (tsquery,),
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(id__in=matched_ids)
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", "id")
+        )
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend() -> SearchBackend:
+    return SEARCH_BACKENDS.get(connection.vendor, SearchBackend)()
@@ -0,0 +1,111 @@
+"""
+Session write volume and latency under each ``SESSION_MODE``.
+
+For every mode a visitor logs in, adds pizzas to the cart, views it and
+checks out through the test client, on a small catalogue that is rolled
+back afterwards. Statements touching ``django_session`` are counted
+separately from the rest of the request's queries.
+"""
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from pizza.benchmarks import (
+    BENCHMARK_PASSWORD,
+    BENCHMARK_USERNAME,
+    Rollback,
+    seed_catalogue,
+)
+from pizza.catalogue import bump_catalogue_version
+from pizza.models import PizzaSize
+from pizza_mate.middleware import PERCENTILES, percentile
+from pizza_mate.sessions import SESSION_ENGINES
+
+SESSION_TABLE = "django_session"
+
+
+class SessionQueryCounter:
+    def __init__(self) -> None:
+        self.reads = 0
+        self.writes = 0
+        self.other = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if SESSION_TABLE not in sql:
+            self.other += 1
+        elif sql.lstrip().upper().startswith("SELECT"):
+            self.reads += 1
+        else:
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+
+def get_visit(context, cart_requests) -> list:
+    order_url = reverse(
+        "pizza:order-pizza", kwargs={"pk": context["pizza"].id}
+    )
+    return [
+        ("post", reverse("login"), {
+            "username": BENCHMARK_USERNAME,
+            "password": BENCHMARK_PASSWORD,
+        }),
+        *[("post", order_url, {"size": context["size"]})] * cart_requests,
+        ("get", reverse("pizza:cart"), {}),
+        ("get", reverse("pizza:home-page"), {}),
+        ("post", reverse("pizza:order-confirmation"), {}),
+    ]
+
+
+def measure_mode(engine, visit, visits) -> dict:
+    counter = SessionQueryCounter()
+    timings = []
+    cookie_bytes = 0
+    with override_settings(SESSION_ENGINE=engine):
+        for _ in range(visits):
+            # A new client loads the middleware with this mode's engine
+            client = Client()
+            for method, url, data in visit:
+                start = time.perf_counter()
+                with connection.execute_wrapper(counter):
+                    getattr(client, method)(url, data)
+                timings.append((time.perf_counter() - start) * 1000)
+                cookie = client.cookies.get(settings.SESSION_COOKIE_NAME)
+                if cookie is not None:
+                    cookie_bytes = max(cookie_bytes, len(cookie.value))
+
+    timings.sort()
+    return {
+        "session_reads": counter.reads,
+        "session_writes": counter.writes,
+        "other_queries": counter.other,
+        "max_cookie_bytes": cookie_bytes,
+        "latency_ms": {
+            f"p{percent}": round(percentile(timings, percent), 3)
+            for percent in PERCENTILES
+        },
+    }
+
+
+def run_session_benchmark(visits, cart_requests=3) -> dict:
+    result = {"visits": visits, "cart_requests": cart_requests}
+    try:
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ), transaction.atomic():
+            context = seed_catalogue(pizzas=4, ingredients=4, orders=0)
+            visit = get_visit(context, cart_requests)
+            result["requests_per_visit"] = len(visit)
+            result["modes"] = {
+                mode: measure_mode(engine, visit, visits)
+                for mode, engine in SESSION_ENGINES.items()
+            }
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        PizzaSize.invalidate_size_table()
+        bump_catalogue_version()
+    return result
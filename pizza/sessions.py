@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from pizza_mate.sessions import DB_SESSION_ENGINES
+
+SWEEP_BATCH_SIZE = 1000
+
+
+def delete_expired_sessions(batch_size=SWEEP_BATCH_SIZE) -> int:
+    """Delete expired ``django_session`` rows in batches; returns the count."""
+    if settings.SESSION_ENGINE not in DB_SESSION_ENGINES:
+        return 0
+    expired = Session.objects.filter(expire_date__lt=timezone.now())
+    deleted = 0
+    while True:
+        keys = list(expired.values_list("session_key", flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += Session.objects.filter(session_key__in=keys).delete()[0]
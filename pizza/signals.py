@@ -0,0 +1,104 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from pizza.catalogue import bump_catalogue_version, bump_pizza_versions
+from pizza.images import reset_uploaded_renditions, schedule_renditions
+from pizza.models import Ingredient, IngredientType, Pizza, PizzaSize
+from pizza.recalculation import invalidate_pizza_summary
+from pizza.search import get_search_backend
+
+
+@receiver([post_save, post_delete], sender=PizzaSize)
+def invalidate_size_table(sender, **kwargs) -> None:
+    PizzaSize.invalidate_size_table()
+
+
+# Any catalogue write invalidates the ingredient catalogue and every
+# cached menu page and card keyed by the catalogue version
+@receiver([post_save, post_delete], sender=PizzaSize)
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=IngredientType)
+def invalidate_catalogue(sender, **kwargs) -> None:
+    bump_catalogue_version()
+
+
+# A pizza moved between the shared menu and a user (in the admin) must
+# also leave the previous owner's pages
+@receiver(pre_save, sender=Pizza)
+def remember_pizza_owner(sender, instance, **kwargs) -> None:
+    instance._previous_user_id = instance.user_id
+    if not instance._state.adding:
+        previous = Pizza.objects.filter(pk=instance.pk).values_list(
+            "user_id", flat=True
+        )
+        instance._previous_user_id = next(iter(previous), instance.user_id)
+
+
+# A custom pizza is only on its owner's pages
+@receiver([post_save, post_delete], sender=Pizza)
+def invalidate_pizza_pages(sender, instance, **kwargs) -> None:
+    previous_user_id = getattr(
+        instance, "_previous_user_id", instance.user_id
+    )
+    bump_pizza_versions([instance.user_id, previous_user_id])
+
+
+@receiver(post_save, sender=Pizza)
+def index_pizza(sender, instance, **kwargs) -> None:
+    invalidate_pizza_summary(instance.id)
+    get_search_backend().index([instance])
+
+
+@receiver(pre_save, sender=Pizza)
+def reset_image_renditions(sender, instance, **kwargs) -> None:
+    reset_uploaded_renditions(instance)
+
+
+@receiver(post_save, sender=Pizza)
+def schedule_image_renditions(sender, instance, **kwargs) -> None:
+    schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Pizza)
+def remove_pizza_from_index(sender, instance, **kwargs) -> None:
+    invalidate_pizza_summary(instance.id)
+    get_search_backend().remove(instance.id)
+
+
+@receiver(m2m_changed, sender=Pizza.ingredients.through)
+def index_pizza_ingredients(
+    sender, instance, action, reverse, pk_set, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    backend = get_search_backend()
+    if not reverse:
+        bump_pizza_versions([instance.user_id])
+        invalidate_pizza_summary(instance.id)
+        backend.index([instance])
+    elif pk_set:
+        pizzas = Pizza.objects.filter(id__in=pk_set)
+        bump_pizza_versions(pizzas.values_list("user_id", flat=True))
+        for pizza_id in pk_set:
+            invalidate_pizza_summary(pizza_id)
+        backend.index(pizzas)
+    else:
+        bump_catalogue_version()
+        backend.rebuild()
+
+
+@receiver(post_save, sender=Ingredient)
+def index_ingredient_pizzas(sender, instance, created, **kwargs) -> None:
+    if not created:
+        get_search_backend().index(instance.pizzas.all())
+
+
+@receiver(post_delete, sender=Ingredient)
+def reindex_after_ingredient_delete(sender, **kwargs) -> None:
+    get_search_backend().rebuild()
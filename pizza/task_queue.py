@@ -0,0 +1,213 @@
+"""
+Database-backed task queue. Tasks are rows in ``pizza_task``; workers
+started by ``manage.py run_workers`` claim due rows, run the registered
+function and retry failures with exponential backoff.
+"""
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from pizza.models import Task
+
+logger = logging.getLogger("pizza.tasks")
+
+registry = {}
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def task(name, max_attempts=5):
+    """Register a function, called with the payload as keyword arguments."""
+
+    def register(function):
+        registry[name] = (function, max_attempts)
+        return function
+
+    return register
+
+
+def enqueue(name, payload=None, idempotency_key=None, delay=0) -> Task:
+    """
+    Queue ``name`` in the caller's transaction, so the task only becomes
+    visible if that transaction commits. A task whose idempotency key
+    was already used is not queued again.
+    """
+    if name not in registry:
+        raise ValueError(f"Unknown task: {name}")
+
+    fields = {
+        "name": name,
+        "payload": payload or {},
+        "max_attempts": registry[name][1],
+        "run_after": timezone.now() + timedelta(seconds=delay),
+    }
+    if idempotency_key is None:
+        return Task.objects.create(**fields)
+    queued_task, _ = Task.objects.get_or_create(
+        idempotency_key=idempotency_key, defaults=fields
+    )
+    return queued_task
+
+
+# One run per interval however many workers schedule it: the key names
+# the interval the run is due at the end of
+def schedule_periodic(name, interval) -> Task:
+    now = time.time()
+    slot = int(now // interval) + 1
+    return enqueue(
+        name,
+        idempotency_key=f"{name}:{slot}",
+        delay=slot * interval - now,
+    )
+
+
+def purge_finished_tasks(batch_size=1000) -> int:
+    """
+    Delete tasks finished longer ago than their retention: DONE tasks
+    after ``TASK_RETENTION`` seconds, FAILED ones (kept for inspection
+    and re-queueing) after ``TASK_FAILED_RETENTION``. Returns the count.
+    """
+    now = timezone.now()
+    done_before = now - timedelta(
+        seconds=get_setting("TASK_RETENTION", 7 * 24 * 60 * 60)
+    )
+    failed_before = now - timedelta(
+        seconds=get_setting("TASK_FAILED_RETENTION", 30 * 24 * 60 * 60)
+    )
+    finished = Task.objects.filter(
+        Q(status=Task.DONE, finished_at__lt=done_before)
+        | Q(status=Task.FAILED, finished_at__lt=failed_before)
+    ).order_by()
+    deleted = 0
+    while True:
+        ids = list(finished.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Task.objects.filter(id__in=ids).delete()[0]
+
+
+def get_retry_delay(attempts) -> float:
+    return min(
+        get_setting("TASK_RETRY_BACKOFF", 10) * 2 ** (attempts - 1),
+        get_setting("TASK_RETRY_BACKOFF_MAX", 60 * 60),
+    )
+
+
+def get_claimable_filter(now) -> Q:
+    # Running rows whose lock expired belong to a worker that died
+    stale = now - timedelta(seconds=get_setting("TASK_LOCK_TIMEOUT", 600))
+    return Q(status=Task.QUEUED, run_after__lte=now) | Q(
+        status=Task.RUNNING, locked_at__lt=stale
+    )
+
+
+def lock_next_task(worker_id, now, candidates, claimable):
+    task_id = candidates.values_list("id", flat=True).first()
+    if task_id is None:
+        return None
+    # The conditional update is what makes the claim exclusive on
+    # backends without row locks: only one worker sees a match
+    claimed = Task.objects.filter(claimable, id=task_id).update(
+        status=Task.RUNNING,
+        attempts=F("attempts") + 1,
+        locked_by=worker_id,
+        locked_at=now,
+    )
+    return task_id if claimed else None
+
+
+def claim_task(worker_id):
+    now = timezone.now()
+    claimable = get_claimable_filter(now)
+    candidates = Task.objects.filter(claimable).order_by("run_after", "id")
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            task_id = lock_next_task(
+                worker_id,
+                now,
+                candidates.select_for_update(skip_locked=True),
+                claimable,
+            )
+    else:
+        # SQLite: a read followed by a write in one transaction fails
+        # instead of waiting when another worker holds the write lock
+        task_id = lock_next_task(worker_id, now, candidates, claimable)
+    if task_id is None:
+        return None
+    return Task.objects.get(id=task_id)
+
+
+def run_task(claimed_task) -> None:
+    """
+    Run a claimed task. Its database writes commit together with the
+    ``done`` status, so a retry never sees half of an earlier attempt.
+    """
+    entry = registry.get(claimed_task.name)
+    try:
+        if entry is None:
+            raise LookupError(f"Unknown task: {claimed_task.name}")
+        with transaction.atomic():
+            entry[0](**claimed_task.payload)
+            Task.objects.filter(id=claimed_task.id).update(
+                status=Task.DONE,
+                locked_by="",
+                locked_at=None,
+                last_error="",
+                finished_at=timezone.now(),
+            )
+    except Exception:
+        record_failure(claimed_task, traceback.format_exc(), entry is None)
+
+
+def record_failure(failed_task, error, permanent=False) -> None:
+    fields = {"locked_by": "", "locked_at": None, "last_error": error}
+    if permanent or failed_task.attempts >= failed_task.max_attempts:
+        fields.update(status=Task.FAILED, finished_at=timezone.now())
+        logger.error("Task %s failed:\n%s", failed_task, error)
+    else:
+        delay = get_retry_delay(failed_task.attempts)
+        fields.update(
+            status=Task.QUEUED,
+            run_after=timezone.now() + timedelta(seconds=delay),
+        )
+        logger.warning("Task %s retrying in %ss", failed_task, delay)
+    Task.objects.filter(id=failed_task.id).update(**fields)
+
+
+def run_pending_tasks(worker_id="inline", limit=None) -> int:
+    """Run due tasks until the queue is drained; returns how many ran."""
+    count = 0
+    while limit is None or count < limit:
+        claimed_task = claim_task(worker_id)
+        if claimed_task is None:
+            break
+        run_task(claimed_task)
+        count += 1
+    return count
+
+
+def work(worker_id, stop_event, poll_interval=1.0, burst=False) -> None:
+    """Worker loop; ``burst`` exits once no task is due."""
+    try:
+        while not stop_event.is_set():
+            try:
+                claimed_task = claim_task(worker_id)
+            except DatabaseError:
+                logger.exception("Worker %s could not claim a task", worker_id)
+                claimed_task = None
+            if claimed_task is not None:
+                run_task(claimed_task)
+            elif burst:
+                break
+            else:
+                stop_event.wait(poll_interval)
+    finally:
+        connection.close()
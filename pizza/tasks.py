@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from pizza.images import generate_renditions
+from pizza.models import Order, Pizza
+from pizza.sales import record_daily_sales
+from pizza.sessions import delete_expired_sessions
+from pizza.task_queue import purge_finished_tasks, schedule_periodic, task
+
+
+@task("generate_renditions")
+def generate_image_renditions(source, digest=None) -> None:
+    pizza = Pizza.objects.only("image").filter(image=source).first()
+    if pizza is not None:
+        generate_renditions(pizza.image, digest=digest)
+
+
+# A worker that outlives the lock timeout sees its task run again;
+# flagging the order in the same transaction counts it only once
+@task("record_order_sales")
+def record_order_sales(order_id) -> None:
+    if Order.objects.filter(id=order_id, sales_recorded=False).update(
+        sales_recorded=True
+    ):
+        order = Order.objects.get(id=order_id)
+        record_daily_sales(order, order.orderpizza_set.all())
+
+
+@task("send_order_confirmation", max_attempts=8)
+def send_order_confirmation(order_id) -> None:
+    order = Order.objects.select_related("customer").filter(
+        id=order_id
+    ).first()
+    if order is None or not order.customer.email:
+        return
+
+    lines = [
+        f"{line.quantity} x {line.pizza_name} ({line.size_name}): "
+        f"{line.unit_price * line.quantity} UAH"
+        for line in order.orderpizza_set.all()
+    ]
+    send_mail(
+        f"PizzaMate order #{order.id}",
+        "\n".join([*lines, f"Total: {order.total_price} UAH"]),
+        None,
+        [order.customer.email],
+    )
+
+
+def schedule_sweep() -> None:
+    schedule_periodic("sweep", getattr(settings, "SWEEP_INTERVAL", 60 * 60))
+
+
+# Reschedules itself, so one sweep is always queued while workers run
+@task("sweep")
+def sweep() -> None:
+    delete_expired_sessions()
+    purge_finished_tasks()
+    schedule_sweep()
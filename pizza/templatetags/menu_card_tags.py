@@ -0,0 +1,11 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from pizza.menu_cache import render_menu_card
+
+register = template.Library()
+
+
+@register.simple_tag
+def menu_card(pizza) -> str:
+    return mark_safe(render_menu_card(pizza))
@@ -0,0 +1,18 @@
+from django import template
+
+from pizza.images import get_image_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag("includes/pizza_picture.html")
+def pizza_picture(
+    pizza, sizes="100vw", css_class="img-fluid", loading="lazy"
+) -> dict:
+    return {
+        "pizza": pizza,
+        "image": get_image_sources(pizza),
+        "sizes": sizes,
+        "css_class": css_class,
+        "loading": loading,
+    }
@@ -0,0 +1,11 @@
+from django.urls import include, path
+
+from pizza.urls import app_name, get_urlpatterns
+
+urlpatterns = [
+    path(
+        "",
+        include((get_urlpatterns(async_views=True), app_name)),
+    ),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pizza.models import (
+    CustomUser,
+    Ingredient,
+    Order,
+    OrderPizza,
+    Pizza,
+    PizzaSize,
+)
+from pizza.pagination import EstimatedCountPaginator
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin = CustomUser.objects.create_superuser(
+            username="admin", password="admin_pass", email=""
+        )
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        cls.size = PizzaSize.objects.create(
+            name="Big", weight=700, multiplier=2.0
+        )
+        Ingredient.objects.create(name="Mozzarella", description="")
+        Ingredient.objects.create(name="Tomato", description="")
+        cls.pizza = Pizza.objects.create(
+            name="Margarita", base_price=100, user=cls.admin
+        )
+        cls.order = Order.objects.create(customer=cls.admin, total_price=200)
+        OrderPizza.objects.create(
+            order=cls.order,
+            pizza=cls.pizza,
+            quantity=1,
+            size=cls.size,
+            size_name="Big",
+            unit_price=200,
+        )
+
+    def setUp(self) -> None:
+        self.client.force_login(self.admin)
+
+    def test_pizza_changelist_queries_do_not_grow_with_rows(self) -> None:
+        url = reverse("admin:pizza_pizza_changelist")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        for number in range(20):
+            Pizza.objects.create(
+                name=f"Pizza {number}",
+                base_price=100,
+                size=self.size,
+                user=self.admin,
+            )
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertContains(response, "Pizza 19")
+        self.assertEqual(len(few), len(many))
+
+    def test_pizza_form_uses_autocomplete_for_ingredients(self) -> None:
+        response = self.client.get(
+            reverse("admin:pizza_pizza_change", args=[self.pizza.pk])
+        )
+
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, "Mozzarella")
+
+        results = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "pizza",
+                "model_name": "pizza",
+                "field_name": "ingredients",
+                "term": "mozz",
+            },
+        ).json()["results"]
+        self.assertEqual(
+            [result["text"] for result in results], ["Mozzarella"]
+        )
+
+    def test_order_admin_shows_lines_inline(self) -> None:
+        changelist = self.client.get(reverse("admin:pizza_order_changelist"))
+        change = self.client.get(
+            reverse("admin:pizza_order_change", args=[self.order.pk])
+        )
+
+        self.assertEqual(
+            list(changelist.context["cl"].result_list), [self.order]
+        )
+        self.assertContains(changelist, '<nav class="toplinks">')
+        self.assertContains(change, "orderpizza_set-0-pizza")
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        Pizza.objects.create(name="Margarita", base_price=100)
+
+    def test_counts_exactly_outside_postgres(self) -> None:
+        paginator = EstimatedCountPaginator(Pizza.objects.all(), 10)
+
+        self.assertEqual(paginator.count, 1)
+
+    @mock.patch.object(connection, "vendor", "postgresql")
+    @mock.patch("pizza.pagination.get_table_estimate", return_value=2_000_000)
+    @mock.patch("pizza.pagination.get_plan_estimate", return_value=1_500)
+    def test_large_postgres_tables_use_estimates(
+        self, plan_estimate, table_estimate
+    ) -> None:
+        unfiltered = EstimatedCountPaginator(Pizza.objects.all(), 10)
+        filtered = EstimatedCountPaginator(
+            Pizza.objects.filter(name="Margarita"), 10
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(unfiltered.count, 2_000_000)
+            self.assertEqual(filtered.count, 1_500)
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pizza.models import CustomUser, Ingredient, Pizza, PizzaSize
+from pizza.views import AsyncPizzaListView
+
+
+@override_settings(ROOT_URLCONF="pizza.tests.async_urls")
+class AsyncMenuViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        cls.tomato = Ingredient.objects.create(name="Tomato", description="")
+        cls.cheese = Ingredient.objects.create(name="Cheese", description="")
+        cls.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        cls.pizza.ingredients.add(cls.tomato)
+        Pizza.objects.create(name="Veggie", base_price=90, user=cls.user)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    async def test_menu_lists_shared_pizzas_with_prices(self) -> None:
+        response = await self.async_client.get(reverse("pizza:home-page"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [pizza.name for pizza in response.context["pizza_list"]],
+            ["Margarita"],
+        )
+        self.assertEqual(
+            response.context["pizza_list"][0].prices,
+            {"Small": 100, "Big": 200},
+        )
+
+    async def test_menu_includes_own_pizzas_when_logged_in(self) -> None:
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        response = await self.async_client.get(reverse("pizza:home-page"))
+
+        self.assertEqual(
+            [pizza.name for pizza in response.context["pizza_list"]],
+            ["Margarita", "Veggie"],
+        )
+
+    async def test_menu_pages_follow_the_cursor(self) -> None:
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        with mock.patch.object(AsyncPizzaListView, "page_size", 1):
+            first = await self.async_client.get(reverse("pizza:home-page"))
+            second = await self.async_client.get(
+                first.context["next_fragment_url"]
+            )
+
+        self.assertEqual(
+            [pizza.name for pizza in second.context["pizza_list"]],
+            ["Veggie"],
+        )
+        self.assertIsNone(second.context["next_cursor"])
+        self.assertNotContains(second, "<html")
+
+    async def test_menu_pages_are_read_without_the_sync_path(self) -> None:
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        with mock.patch.object(
+            AsyncPizzaListView, "get_menu_page", side_effect=AssertionError
+        ):
+            menu = await self.async_client.get(reverse("pizza:home-page"))
+            search = await self.async_client.get(
+                reverse("pizza:home-page"), {"search": "Veggie"}
+            )
+
+        self.assertEqual(len(menu.context["pizza_list"]), 2)
+        self.assertEqual(
+            [pizza.name for pizza in search.context["pizza_list"]],
+            ["Veggie"],
+        )
+
+    async def test_anonymous_menu_is_served_from_page_cache(self) -> None:
+        await self.async_client.get(reverse("pizza:home-page"))
+
+        response = await self.async_client.get(reverse("pizza:home-page"))
+
+        self.assertIsNone(response.context)
+        self.assertContains(response, "Margarita")
+
+    async def test_detail_renders_prices_for_selected_size(self) -> None:
+        url = reverse("pizza:pizza-detail", kwargs={"pk": self.pizza.pk})
+
+        response = await self.async_client.get(url, {"size": "Big"})
+        post_response = await self.async_client.post(url, {"size": "Big"})
+
+        self.assertEqual(response.context["size"], "Big")
+        self.assertEqual(
+            response.context["pizza_prices"], {"Small": 100, "Big": 200}
+        )
+        self.assertEqual(post_response.status_code, 303)
+        self.assertEqual(post_response["Location"], f"{url}?size=Big")
+        missing = await self.async_client.get(
+            reverse("pizza:pizza-detail", kwargs={"pk": 0})
+        )
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_unchanged_detail_answers_304(self) -> None:
+        url = reverse("pizza:pizza-detail", kwargs={"pk": self.pizza.pk})
+        response = await self.async_client.get(url)
+
+        not_modified = await self.async_client.get(
+            url, headers={"If-None-Match": response["ETag"]}
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    async def test_recalculation_prices_added_ingredients(self) -> None:
+        response = await self.async_client.post(
+            reverse(
+                "pizza:update-pizza-ingredients", kwargs={"pk": self.pizza.pk}
+            ),
+            {
+                "size": "Big",
+                "ingredients": [self.tomato.id, self.cheese.id],
+                f"ingredient_qty_{self.tomato.id}": 1,
+                f"ingredient_qty_{self.cheese.id}": 2,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["pizza_prices"], {"Small": 120, "Big": 220}
+        )
@@ -0,0 +1,28 @@
+from django.test import TestCase
+
+from pizza.benchmarks import find_query_growth, run_benchmark
+
+EXPECTED_STATUS = {
+    "order-pizza": 302,
+    "order-confirmation": 302,
+}
+
+
+class ViewBenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.small = run_benchmark(pizzas=6, ingredients=8, orders=4, repeat=1)
+        cls.large = run_benchmark(
+            pizzas=30, ingredients=40, orders=25, repeat=1
+        )
+
+    def test_every_route_responds(self) -> None:
+        for name, route in self.large["routes"].items():
+            with self.subTest(route=name):
+                self.assertEqual(
+                    route["status"], EXPECTED_STATUS.get(name, 200)
+                )
+
+    def test_query_count_does_not_grow_with_data(self) -> None:
+        self.assertEqual(find_query_growth(self.small, self.large), [])
@@ -0,0 +1,64 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from pizza.catalogue import bump_catalogue_version
+from pizza.models import PizzaSize
+from pizza_mate.caches import (
+    LOCAL_CACHE_TIMEOUT,
+    REDIS_BACKEND,
+    get_cache_config,
+    get_invalidation_timeout,
+)
+
+REDIS_URL = "redis://cache.example.com:6379/0"
+
+
+class CacheConfigTests(SimpleTestCase):
+    def test_cache_url_selects_shared_redis_cache(self) -> None:
+        config = get_cache_config({"CACHE_URL": REDIS_URL})
+
+        self.assertEqual(
+            config["default"],
+            {"BACKEND": REDIS_BACKEND, "LOCATION": REDIS_URL},
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            get_cache_config({"CACHE_URL": "memory://"})
+
+    def test_only_per_process_caches_cap_timeouts(self) -> None:
+        self.assertEqual(get_invalidation_timeout(), LOCAL_CACHE_TIMEOUT)
+        self.assertEqual(get_invalidation_timeout("default", 10), 10)
+        redis = get_cache_config({"CACHE_URL": REDIS_URL})
+        with override_settings(CACHES=redis):
+            self.assertIsNone(get_invalidation_timeout())
+            self.assertEqual(get_invalidation_timeout("default", 600), 600)
+
+
+class SizeTableCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        PizzaSize.objects.create(name="Small", weight=350, multiplier=0.8)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=1.2)
+        PizzaSize.get_multipliers()
+
+    # update() sends no signals, like a write made by another process
+    def change_small_elsewhere(self) -> None:
+        PizzaSize.objects.filter(name="Small").update(multiplier=2.4)
+
+    def test_shared_catalogue_version_bump_refreshes_sizes(self) -> None:
+        self.change_small_elsewhere()
+        self.assertEqual(PizzaSize.get_multipliers()["Small"], 0.8)
+
+        bump_catalogue_version()
+
+        self.assertEqual(PizzaSize.get_multipliers()["Small"], 2.4)
+
+    def test_per_process_cache_entries_expire(self) -> None:
+        self.change_small_elsewhere()
+        later = time.time() + LOCAL_CACHE_TIMEOUT + 1
+
+        with mock.patch("time.time", return_value=later):
+            self.assertEqual(PizzaSize.get_multipliers()["Small"], 2.4)
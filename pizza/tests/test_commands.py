@@ -0,0 +1,229 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from pizza.catalogue_sync import CatalogueSyncError, JSONArrayReader
+from pizza.models import (
+    CustomUser,
+    DailyPizzaSales,
+    Ingredient,
+    Order,
+    OrderPizza,
+    Pizza,
+    PizzaSize,
+)
+from pizza.tasks import record_order_sales
+
+
+class PizzaStatsCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        medium = PizzaSize.objects.create(
+            name="Medium", weight=500, multiplier=1.0
+        )
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=1.5)
+        margarita = Pizza.objects.create(name="Margarita", base_price=100)
+        pepperoni = Pizza.objects.create(name="Pepperoni", base_price=120)
+
+        for pizza, quantity in ((margarita, 3), (pepperoni, 1)):
+            order = Order.objects.create(
+                customer=user, total_price=pizza.base_price * quantity
+            )
+            OrderPizza.objects.create(
+                order=order,
+                pizza=pizza,
+                quantity=quantity,
+                pizza_name=pizza.name,
+                size=medium,
+                size_name=medium.name,
+                unit_price=pizza.base_price,
+            )
+
+    def get_stats(self, *args) -> dict:
+        output = StringIO()
+        call_command("pizza_stats", *args, stdout=output)
+        return json.loads(output.getvalue())
+
+    def test_reports_daily_revenue_top_pizzas_and_size_mix(self) -> None:
+        stats = self.get_stats()
+
+        self.assertEqual(len(stats["daily"]), 1)
+        self.assertEqual(stats["daily"][0]["orders"], 2)
+        self.assertEqual(
+            [row["key"] for row in stats["top"]], ["Margarita", "Pepperoni"]
+        )
+        self.assertEqual(
+            stats["sizes"], [{"key": "Medium", "quantity": 4}]
+        )
+
+    def test_streaming_matches_group_by(self) -> None:
+        self.assertEqual(
+            self.get_stats("--stream", "--chunk-size", "1"), self.get_stats()
+        )
+
+    def test_date_range_excludes_orders(self) -> None:
+        stats = self.get_stats("--from", "2000-01-01", "--to", "2000-01-02")
+        self.assertEqual(stats, {"daily": [], "top": [], "sizes": []})
+
+    def test_csv_output(self) -> None:
+        output = StringIO()
+        call_command(
+            "pizza_stats", "--format", "csv", "--report", "sizes",
+            stdout=output,
+        )
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            ["report,key,orders,quantity,revenue", "sizes,Medium,,4,"],
+        )
+
+
+class RebuildDailySalesCommandTests(TestCase):
+    def test_rebuild_matches_order_history(self) -> None:
+        user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        PizzaSize.objects.create(name="Small", weight=350, multiplier=0.8)
+        PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.0)
+        pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        for quantity in (1, 2):
+            order = Order.objects.create(customer=user, total_price=100)
+            OrderPizza.objects.create(
+                order=order,
+                pizza=pizza,
+                quantity=quantity,
+                pizza_name=pizza.name,
+                size_name="Medium",
+                unit_price=100,
+            )
+
+        call_command("rebuild_daily_sales", stdout=StringIO())
+        call_command("rebuild_daily_sales", stdout=StringIO())
+
+        sales = DailyPizzaSales.objects.get()
+        self.assertEqual(
+            (sales.pizza_name, sales.orders, sales.quantity, sales.revenue),
+            ("Margarita", 2, 3, 300),
+        )
+
+    def test_lines_of_one_order_count_as_one_order(self) -> None:
+        user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        PizzaSize.objects.create(name="Small", weight=350, multiplier=0.8)
+        PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.0)
+        pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        order = Order.objects.create(customer=user, total_price=180)
+        for deltas in ({}, {"1": 1}):
+            OrderPizza.objects.create(
+                order=order,
+                pizza=pizza,
+                quantity=1,
+                pizza_name=pizza.name,
+                size_name="Small",
+                unit_price=90,
+                ingredient_deltas=deltas,
+            )
+
+        record_order_sales(order_id=order.id)
+        recorded = DailyPizzaSales.objects.values_list(
+            "orders", "quantity", "revenue"
+        ).get()
+        call_command("rebuild_daily_sales", stdout=StringIO())
+        rebuilt = DailyPizzaSales.objects.values_list(
+            "orders", "quantity", "revenue"
+        ).get()
+
+        self.assertEqual(recorded, (1, 2, 180))
+        self.assertEqual(rebuilt, recorded)
+
+
+class SyncCatalogueCommandTests(TestCase):
+    def sync(self, *args) -> str:
+        output = StringIO()
+        self.errors = StringIO()
+        call_command(
+            "sync_catalogue", *args, stdout=output, stderr=self.errors
+        )
+        return output.getvalue()
+
+    def test_import_is_idempotent(self) -> None:
+        first = self.sync(str(settings.BASE_DIR / "ingredients.json"))
+        with self.assertNumQueries(5):
+            second = self.sync(str(settings.BASE_DIR / "ingredients.json"))
+
+        self.assertIn("pizza.pizzasize: 3 created", first)
+        self.assertEqual(PizzaSize.objects.count(), 3)
+        self.assertTrue(Ingredient.objects.exists())
+        for line in second.splitlines():
+            self.assertRegex(line, r": 0 created, 0 updated, \d+ unchanged$")
+
+    def test_export_round_trips_pizzas_and_diffs_changes(self) -> None:
+        self.sync(str(settings.BASE_DIR / "ingredients.json"))
+        pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        pizza.ingredients.set(Ingredient.objects.all()[:2])
+        exported = StringIO()
+        call_command("sync_catalogue", "-", "--export", stdout=exported)
+
+        fixture = json.loads(exported.getvalue())
+        fixture[-1]["fields"]["base_price"] = 150
+        fixture[-1]["fields"]["ingredients"] = fixture[-1]["fields"][
+            "ingredients"
+        ][:1]
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as changed:
+            json.dump(fixture, changed)
+            changed.flush()
+            dry_run = self.sync(changed.name, "--dry-run")
+            self.assertEqual(Pizza.objects.get().base_price, 100)
+            report = self.sync(changed.name, "--batch-size", "2")
+
+        self.assertIn("pizza.pizza: 0 created, 1 updated, 0 unchanged", report)
+        self.assertIn("1 updated", dry_run)
+        pizza = Pizza.objects.get()
+        self.assertEqual(pizza.base_price, 150)
+        self.assertEqual(pizza.ingredients.count(), 1)
+
+    def test_import_never_overwrites_custom_pizzas(self) -> None:
+        self.sync(str(settings.BASE_DIR / "ingredients.json"))
+        user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        custom = Pizza.objects.create(
+            name="My Margarita", base_price=100, user=user
+        )
+        fixture = [
+            {
+                "model": "pizza.pizza",
+                "pk": custom.pk,
+                "fields": {"name": "Margarita", "base_price": 120},
+            }
+        ]
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as colliding:
+            json.dump(fixture, colliding)
+            colliding.flush()
+            with self.assertRaisesMessage(CommandError, "custom pizzas"):
+                self.sync(colliding.name)
+
+        custom.refresh_from_db()
+        self.assertEqual(custom.name, "My Margarita")
+        self.assertEqual(custom.user, user)
+
+    def test_import_warns_without_a_shared_cache(self) -> None:
+        self.sync(str(settings.BASE_DIR / "ingredients.json"))
+
+        self.assertIn("within 60 seconds", self.errors.getvalue())
+
+    def test_reader_handles_values_split_across_chunks(self) -> None:
+        items = [{"pk": 12345, "name": "Tomato é"}, 3.25, [], "x, ]"]
+        reader = JSONArrayReader(StringIO(json.dumps(items)), chunk_size=3)
+
+        self.assertEqual(list(reader), items)
+        with self.assertRaises(CatalogueSyncError):
+            list(JSONArrayReader(StringIO('[{"pk": 1}'), chunk_size=3))
@@ -0,0 +1,165 @@
+import posixpath
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from pizza.images import create_renditions, get_image_sources
+from pizza.models import Pizza, PizzaSize, Task
+from pizza.task_queue import run_pending_tasks
+
+
+def make_png(width, height) -> ContentFile:
+    buffer = BytesIO()
+    Image.new("RGBA", (width, height), (200, 40, 40, 255)).save(
+        buffer, "PNG"
+    )
+    return ContentFile(buffer.getvalue())
+
+
+class PizzaImageRenditionTests(TestCase):
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage",
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL="/media/",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        self.pizza = Pizza(name="Margarita", description="", base_price=100)
+        self.pizza.image.save("margarita.png", make_png(800, 600), save=False)
+        self.pizza.save()
+
+    def test_renditions_are_resized_per_width_and_format(self) -> None:
+        renditions = create_renditions(self.pizza.image)
+
+        self.assertEqual(renditions["source"], self.pizza.image.name)
+        self.assertEqual(
+            [width for width, _ in renditions["files"]["image/webp"]],
+            [320, 640],
+        )
+        for files in renditions["files"].values():
+            for width, name in files:
+                with self.pizza.image.storage.open(name) as rendition:
+                    self.assertEqual(Image.open(rendition).width, width)
+
+    def test_small_images_are_not_upscaled(self) -> None:
+        self.pizza.image.save("tiny.png", make_png(200, 100), save=False)
+
+        renditions = create_renditions(self.pizza.image)
+
+        self.assertEqual(
+            [width for width, _ in renditions["files"]["image/jpeg"]], [200]
+        )
+
+    def test_saving_a_new_image_queues_renditions_once(self) -> None:
+        self.pizza.name = "Margherita"
+        self.pizza.save()
+        self.assertEqual(
+            Task.objects.filter(name="generate_renditions").count(), 1
+        )
+
+        run_pending_tasks()
+
+        self.pizza.refresh_from_db()
+        self.assertEqual(
+            self.pizza.image_renditions["source"], self.pizza.image.name
+        )
+        self.pizza.save()
+        self.assertEqual(
+            Task.objects.filter(name="generate_renditions").count(), 1
+        )
+
+    def test_pizzas_sharing_an_image_reuse_its_renditions(self) -> None:
+        run_pending_tasks()
+        self.pizza.refresh_from_db()
+        custom = Pizza.objects.create(
+            name="My Margarita",
+            description="",
+            base_price=100,
+            image=self.pizza.image.name,
+        )
+
+        self.assertEqual(
+            Task.objects.filter(name="generate_renditions").count(), 1
+        )
+        custom.refresh_from_db()
+        self.assertEqual(custom.image_renditions, self.pizza.image_renditions)
+
+        call_command("generate_renditions", "--force", stdout=StringIO())
+        storage = self.pizza.image.storage
+        for files in self.pizza.image_renditions["files"].values():
+            for _, name in files:
+                self.assertTrue(storage.exists(name))
+
+    def test_upload_replacing_a_file_renews_its_renditions(self) -> None:
+        run_pending_tasks()
+        self.pizza.refresh_from_db()
+        name = self.pizza.image.name
+        storage = self.pizza.image.storage
+
+        # Overwrite the file in place, as S3Boto3Storage does by default
+        def overwrite(name, max_length=None):
+            storage.delete(name)
+            return name
+
+        upload = make_png(200, 100)
+        upload.name = posixpath.basename(name)
+        self.pizza.image = upload
+        with mock.patch.object(storage, "get_available_name", overwrite):
+            self.pizza.save()
+
+        self.assertEqual(self.pizza.image.name, name)
+        self.assertNotIn("source", self.pizza.image_renditions)
+        run_pending_tasks()
+        self.pizza.refresh_from_db()
+        jpegs = self.pizza.image_renditions["files"]["image/jpeg"]
+        self.assertEqual([width for width, _ in jpegs], [200])
+
+    def test_backfill_command_resizes_shared_images_once(self) -> None:
+        Pizza.objects.create(
+            name="Pepperoni",
+            description="",
+            base_price=120,
+            image=self.pizza.image.name,
+        )
+        out = StringIO()
+
+        call_command("generate_renditions", stdout=out)
+        call_command("generate_renditions", stdout=out)
+
+        renditions = {
+            str(pizza.image_renditions) for pizza in Pizza.objects.all()
+        }
+        self.assertEqual(len(renditions), 1)
+        self.assertIn("Generated renditions for 2 pizzas", out.getvalue())
+        self.assertIn("skipped 2", out.getvalue())
+
+    def test_menu_serves_srcset_from_cached_urls(self) -> None:
+        call_command("generate_renditions", stdout=StringIO())
+        self.pizza.refresh_from_db()
+
+        sources = get_image_sources(self.pizza)
+        response = self.client.get(reverse("pizza:home-page"))
+
+        self.assertIn("320w", sources["srcset"])
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, sources["srcset"])
+        with mock.patch(
+            "django.core.files.storage.FileSystemStorage.url"
+        ) as url:
+            self.assertEqual(get_image_sources(self.pizza), sources)
+        url.assert_not_called()
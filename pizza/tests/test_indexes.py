@@ -0,0 +1,122 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pizza.models import (
+    CustomUser,
+    Ingredient,
+    IngredientType,
+    Order,
+    OrderPizza,
+    Pizza,
+    PizzaSize,
+)
+
+# Plan lines that read a whole table without any index
+FULL_SCAN_PATTERNS = {
+    "sqlite": r"^SCAN {table}(?! USING)",
+    "postgresql": r"Seq Scan on {table}\b",
+}
+INDEX_PATTERNS = {
+    "sqlite": r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY",
+    "postgresql": r"Index (Only )?Scan",
+}
+
+
+def explain(sql) -> str:
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Tiny test tables are cheaper to scan; ask whether the
+            # planner *can* use an index rather than whether it would
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+class ViewQueryIndexTests(TestCase):
+    """The main query of each view is answered through an index."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        small = PizzaSize.objects.create(
+            name="Small", weight=300, multiplier=1.0
+        )
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        sauces = IngredientType.objects.create(name="Sauces")
+        tomato = Ingredient.objects.create(
+            name="Tomato", description="", ingredient_type=sauces
+        )
+        cls.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        cls.pizza.ingredients.add(tomato)
+        Pizza.objects.create(name="Veggie", base_price=90, user=cls.user)
+        order = Order.objects.create(customer=cls.user, total_price=100)
+        OrderPizza.objects.create(
+            order=order,
+            pizza=cls.pizza,
+            quantity=1,
+            size=small,
+            size_name="Small",
+            unit_price=100,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def assertQueriesUseIndexes(self, url, table) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if re.match(rf'SELECT .*? FROM "{table}"', query["sql"])
+        ]
+        self.assertTrue(queries, f"No query on {table} for {url}")
+        vendor = connection.vendor
+        for sql in queries:
+            plan = explain(sql)
+            self.assertRegex(plan, INDEX_PATTERNS[vendor], sql)
+            self.assertNotRegex(
+                plan,
+                re.compile(
+                    FULL_SCAN_PATTERNS[vendor].format(table=table),
+                    re.MULTILINE,
+                ),
+                sql,
+            )
+
+    def test_anonymous_menu(self) -> None:
+        self.assertQueriesUseIndexes(reverse("pizza:home-page"), "pizza_pizza")
+
+    def test_menu_with_own_pizzas(self) -> None:
+        self.client.force_login(self.user)
+
+        self.assertQueriesUseIndexes(reverse("pizza:home-page"), "pizza_pizza")
+
+    def test_pizza_detail(self) -> None:
+        url = reverse("pizza:pizza-detail", kwargs={"pk": self.pizza.pk})
+
+        self.assertQueriesUseIndexes(url, "pizza_pizza")
+
+    def test_catalogue_ingredients(self) -> None:
+        url = reverse("pizza:pizza-detail", kwargs={"pk": self.pizza.pk})
+
+        self.assertQueriesUseIndexes(url, "pizza_ingredient")
+
+    def test_user_orders(self) -> None:
+        self.client.force_login(self.user)
+
+        url = reverse("pizza:user-orders")
+
+        self.assertQueriesUseIndexes(url, "pizza_order")
+        self.assertQueriesUseIndexes(url, "pizza_orderpizza")
@@ -39,7 +39,8 @@ class ModelsTest(TestCase):
         self.order_pizza = OrderPizza.objects.create(
             order=self.order,
             pizza=self.pizza,
-            quantity=2
+            quantity=2,
+            unit_price=50,
         )
 
     def test_username_str(self) -> None:
@@ -0,0 +1,69 @@
+import json
+
+from django.core.handlers.asgi import ASGIHandler
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pizza.models import CustomUser, PizzaSize
+from pizza_mate.middleware import RequestMetricsMiddleware
+
+HOME_PAGE_URL = reverse("pizza:home-page")
+REQUEST_METRICS_URL = reverse("request-metrics")
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        self.user = CustomUser.objects.create_user(
+            username="staff_user", password="test_pass", is_staff=True
+        )
+
+    def test_disabled_by_default(self) -> None:
+        response = self.client.get(HOME_PAGE_URL)
+        self.assertNotIn("Server-Timing", response.headers)
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_records_timing_header_and_log_line(self) -> None:
+        with self.assertLogs("pizza_mate.metrics", "INFO") as logs:
+            response = self.client.get(HOME_PAGE_URL)
+
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "pizza:home-page")
+        self.assertEqual(line["bytes"], len(response.content))
+        self.assertGreater(line["template_ms"], 0)
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_staff_summary_has_percentiles_per_url_name(self) -> None:
+        self.client.login(username="staff_user", password="test_pass")
+        with self.assertLogs("pizza_mate.metrics", "INFO"):
+            self.client.get(HOME_PAGE_URL)
+            summary = self.client.get(REQUEST_METRICS_URL).json()
+
+        self.assertIn("p99", summary["pizza:home-page"]["total_ms"])
+        self.assertGreaterEqual(summary["pizza:home-page"]["count"], 1)
+
+    @override_settings(
+        REQUEST_METRICS_ENABLED=True,
+        ROOT_URLCONF="pizza.tests.async_urls",
+    )
+    async def test_async_views_are_measured(self) -> None:
+        with self.assertLogs("pizza_mate.metrics", "INFO") as logs:
+            response = await self.async_client.get(HOME_PAGE_URL)
+
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "pizza:home-page")
+        self.assertGreater(line["queries"], 0)
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_middleware_runs_async_under_asgi(self) -> None:
+        handler = ASGIHandler()
+        middleware = handler._middleware_chain.__wrapped__
+
+        self.assertIsInstance(middleware, RequestMetricsMiddleware)
+        self.assertTrue(middleware.async_mode)
+
+    def test_summary_requires_staff(self) -> None:
+        response = self.client.get(REQUEST_METRICS_URL)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pizza.models import CustomUser, Pizza, PizzaSize, Task
+from pizza.session_benchmarks import run_session_benchmark
+from pizza.sessions import delete_expired_sessions
+from pizza.tasks import schedule_sweep, sweep
+from pizza_mate.caches import get_cache_config
+from pizza_mate.sessions import SESSION_ENGINES, get_session_engine
+
+
+class SessionConfigTests(SimpleTestCase):
+    def test_modes_map_to_engines(self) -> None:
+        local = get_cache_config({})["default"]
+        self.assertEqual(
+            get_session_engine("signed_cookies", local),
+            "django.contrib.sessions.backends.signed_cookies",
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            get_session_engine("redis", local)
+
+    def test_cache_modes_need_a_shared_cache(self) -> None:
+        local = get_cache_config({})["default"]
+        shared = get_cache_config({"CACHE_URL": "redis://cache:6379/0"})
+
+        for mode in ("cached_db", "cache"):
+            with self.assertRaisesMessage(ImproperlyConfigured, "CACHE_URL"):
+                get_session_engine(mode, local)
+            self.assertEqual(
+                get_session_engine(mode, shared["default"]),
+                SESSION_ENGINES[mode],
+            )
+
+
+@override_settings(SESSION_ENGINE=SESSION_ENGINES["signed_cookies"])
+class SignedCookieCartTests(TestCase):
+    def test_order_flow_writes_no_session_rows(self) -> None:
+        user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        self.client.login(username="test_user", password="test_pass")
+
+        self.client.post(
+            reverse("pizza:order-pizza", kwargs={"pk": pizza.pk}),
+            data={"size": "Big", "quantity": 2},
+        )
+        response = self.client.get(reverse("pizza:cart"))
+        self.client.post(reverse("pizza:order-confirmation"))
+
+        self.assertEqual(response.context["cart_total"], 400)
+        self.assertEqual(user.order_set.get().total_price, 400)
+        self.assertFalse(Session.objects.exists())
+
+
+class SessionSweepTests(TestCase):
+    def test_sweep_deletes_expired_sessions_and_reschedules(self) -> None:
+        now = timezone.now()
+        for key, expire_date in (
+            ("expired", now - timedelta(days=1)),
+            ("active", now + timedelta(days=1)),
+        ):
+            Session.objects.create(
+                session_key=key, session_data="", expire_date=expire_date
+            )
+        schedule_sweep()
+        schedule_sweep()
+        queued = Task.objects.get(name="sweep")
+        self.assertGreater(queued.run_after, now)
+
+        with override_settings(SWEEP_INTERVAL=1):
+            sweep()
+
+        self.assertEqual(
+            list(Session.objects.values_list("session_key", flat=True)),
+            ["active"],
+        )
+        self.assertEqual(Task.objects.filter(name="sweep").count(), 2)
+
+    @override_settings(SESSION_ENGINE=SESSION_ENGINES["cache"])
+    def test_sweep_skips_sessions_without_session_rows(self) -> None:
+        with self.assertNumQueries(0):
+            self.assertEqual(delete_expired_sessions(), 0)
+
+
+class SessionBenchmarkTests(TestCase):
+    def test_cache_and_cookie_modes_write_no_session_rows(self) -> None:
+        report = run_session_benchmark(visits=1, cart_requests=2)
+
+        modes = report["modes"]
+        self.assertGreater(modes["db"]["session_writes"], 0)
+        self.assertLess(
+            modes["cached_db"]["session_reads"], modes["db"]["session_reads"]
+        )
+        self.assertEqual(modes["cache"]["session_writes"], 0)
+        self.assertEqual(modes["signed_cookies"]["session_writes"], 0)
+        self.assertFalse(Session.objects.exists())
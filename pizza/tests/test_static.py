@@ -0,0 +1,71 @@
+import re
+import shutil
+import tempfile
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+
+
+class AssetURLParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs) -> None:
+        self.urls.extend(
+            value for name, value in attrs if name in ("href", "src")
+        )
+
+
+class FingerprintedStaticTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, static_root)
+        # Overriding the storage as well rebuilds it for the new root
+        cls.enterClassContext(
+            override_settings(
+                STATIC_ROOT=static_root,
+                STATICFILES_STORAGE=settings.STATICFILES_STORAGE,
+            )
+        )
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_static_urls(self) -> list:
+        response = self.client.get(reverse("pizza:home-page"))
+        self.assertTemplateUsed(response, "base.html")
+        parser = AssetURLParser()
+        parser.feed(response.content.decode())
+        return [
+            url
+            for url in parser.urls
+            if url.startswith(f"/{settings.STATIC_URL.lstrip('/')}")
+        ]
+
+    def test_base_template_references_only_fingerprinted_urls(self) -> None:
+        urls = self.get_static_urls()
+
+        self.assertGreaterEqual(len(urls), 2)
+        for url in urls:
+            self.assertRegex(url, FINGERPRINTED)
+
+    def test_fingerprinted_assets_are_immutable_and_precompressed(
+        self,
+    ) -> None:
+        response = self.client.get(
+            self.get_static_urls()[0], HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pizza.models import (
+    CustomUser,
+    DailyPizzaSales,
+    Ingredient,
+    Pizza,
+    PizzaSize,
+    Task,
+)
+from pizza.task_queue import (
+    claim_task,
+    enqueue,
+    purge_finished_tasks,
+    run_pending_tasks,
+    task,
+)
+from pizza.tasks import record_order_sales
+
+calls = []
+
+
+@task("test_record_call", max_attempts=2)
+def record_call(value, fail=False) -> None:
+    Ingredient.objects.create(name=f"Call {value}", description="")
+    calls.append(value)
+    if fail:
+        raise RuntimeError("boom")
+
+
+@override_settings(TASK_RETRY_BACKOFF=30, TASK_LOCK_TIMEOUT=60)
+class TaskQueueTests(TestCase):
+    def setUp(self) -> None:
+        calls.clear()
+
+    def test_idempotency_key_queues_a_task_once(self) -> None:
+        first = enqueue("test_record_call", {"value": 1}, "call:1")
+        second = enqueue("test_record_call", {"value": 2}, "call:1")
+
+        self.assertEqual(first, second)
+        self.assertEqual(run_pending_tasks(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_unknown_tasks_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            enqueue("no_such_task")
+
+    def test_failures_retry_with_backoff_then_fail(self) -> None:
+        queued = enqueue("test_record_call", {"value": 1, "fail": True})
+
+        with self.assertLogs("pizza.tasks", "WARNING"):
+            run_pending_tasks()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(
+            queued.run_after, timezone.now() + timedelta(seconds=25)
+        )
+        self.assertIn("boom", queued.last_error)
+        # Not due yet, so nothing runs
+        self.assertEqual(run_pending_tasks(), 0)
+
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs("pizza.tasks", "ERROR"):
+            run_pending_tasks()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(calls, [1, 1])
+        # Writes of failed attempts are rolled back
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_stale_running_tasks_are_reclaimed(self) -> None:
+        queued = enqueue("test_record_call", {"value": 1})
+        self.assertEqual(claim_task("dead-worker"), queued)
+        self.assertIsNone(claim_task("other-worker"))
+
+        Task.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        reclaimed = claim_task("other-worker")
+
+        self.assertEqual(reclaimed.locked_by, "other-worker")
+        self.assertEqual(reclaimed.attempts, 2)
+
+    def test_finished_tasks_are_purged_after_their_retention(self) -> None:
+        for value in range(3):
+            enqueue("test_record_call", {"value": value})
+        run_pending_tasks()
+        enqueue("test_record_call", {"value": 3})
+        Task.objects.filter(payload__value=0).update(
+            finished_at=timezone.now() - timedelta(days=8)
+        )
+        Task.objects.filter(payload__value=1).update(
+            status=Task.FAILED,
+            finished_at=timezone.now() - timedelta(days=8),
+        )
+
+        self.assertEqual(purge_finished_tasks(batch_size=1), 1)
+        self.assertEqual(
+            sorted(Task.objects.values_list("payload__value", flat=True)),
+            [1, 2, 3],
+        )
+
+    def test_run_workers_drains_the_queue_in_burst_mode(self) -> None:
+        for value in range(3):
+            enqueue("test_record_call", {"value": value})
+
+        call_command(
+            "run_workers", processes=1, burst=True, stdout=StringIO()
+        )
+
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 3)
+
+
+class OrderTaskTests(TestCase):
+    def test_checkout_queues_sales_and_confirmation_email(self) -> None:
+        user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass", email="a@b.c"
+        )
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        Task.objects.all().delete()
+        self.client.force_login(user)
+        self.client.post(
+            reverse("pizza:order-pizza", kwargs={"pk": pizza.pk}),
+            data={"size": "Big", "quantity": 2},
+        )
+
+        self.client.post(reverse("pizza:order-confirmation"))
+
+        self.assertEqual(
+            sorted(Task.objects.values_list("name", flat=True)),
+            ["record_order_sales", "send_order_confirmation"],
+        )
+        self.assertEqual(mail.outbox, [])
+        run_pending_tasks()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("2 x Margarita (Big): 400.00 UAH", mail.outbox[0].body)
+
+        # A run repeated after a lost lock counts the order only once
+        record_order_sales(order_id=user.order_set.get().id)
+        self.assertEqual(DailyPizzaSales.objects.get().quantity, 2)
@@ -1,9 +1,18 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from pizza.models import Pizza, CustomUser, PizzaSize
+from pizza.models import (
+    Pizza, CustomUser, PizzaSize, Ingredient, IngredientType, Order,
+    OrderPizza, DailyPizzaSales, Task
+)
 from django.db.models import Q
+from pizza.search import PostgresSearchBackend
+from pizza.task_queue import run_pending_tasks
 
 HOME_PAGE_URL = reverse("pizza:home-page")
+USER_ORDERS_URL = reverse("pizza:user-orders")
 
 
 class PizzaListViewTests(TestCase):
@@ -47,12 +56,242 @@ class PizzaListViewTests(TestCase):
         )
 
     def test_queryset_with_search_query(self) -> None:
+        self.client.login(username="test_user", password="password12345")
         response = self.client.get(HOME_PAGE_URL, {"search": "Veggie"})
         self.assertQuerysetEqual(
             response.context["object_list"],
             [Pizza.objects.get(name="Veggie")]
         )
 
+    def test_search_keeps_other_users_pizzas_hidden(self) -> None:
+        response = self.client.get(HOME_PAGE_URL, {"search": "Veggie"})
+        self.assertQuerysetEqual(response.context["object_list"], [])
+
+    def test_search_matches_ingredient_name_prefix(self) -> None:
+        ingredient = Ingredient.objects.create(
+            name="Mozzarella", description="Cheese"
+        )
+        Pizza.objects.get(name="Pepperoni").ingredients.add(ingredient)
+        response = self.client.get(HOME_PAGE_URL, {"search": "mozz"})
+        self.assertQuerysetEqual(
+            response.context["object_list"],
+            [Pizza.objects.get(name="Pepperoni")]
+        )
+
+    def test_prices_attached_to_every_pizza(self) -> None:
+        for pizza in self.response.context["object_list"]:
+            self.assertEqual(
+                pizza.prices, {"Small": 100, "Medium": 150, "Big": 200}
+            )
+
+    def test_query_count_does_not_grow_with_menu(self) -> None:
+        self.client.login(username="test_user", password="password12345")
+        with CaptureQueriesContext(connection) as small_menu:
+            self.client.get(HOME_PAGE_URL)
+
+        Pizza.objects.bulk_create(
+            Pizza(name=f"Pizza {number}", base_price=100)
+            for number in range(60)
+        )
+
+        with CaptureQueriesContext(connection) as big_menu:
+            self.client.get(HOME_PAGE_URL)
+
+        self.assertEqual(len(small_menu), len(big_menu))
+
+    def test_anonymous_menu_served_from_cache(self) -> None:
+        with self.assertNumQueries(0):
+            response = self.client.get(HOME_PAGE_URL)
+        self.assertContains(response, "Pepperoni")
+
+    def test_anonymous_menu_invalidated_on_pizza_change(self) -> None:
+        Pizza.objects.create(name="Hawaiian", base_price=120)
+        response = self.client.get(HOME_PAGE_URL)
+        self.assertContains(response, "Hawaiian")
+
+    def test_unchanged_menu_answers_304_without_queries(self) -> None:
+        etag = self.response["ETag"]
+        self.assertIn("no-cache", self.response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                HOME_PAGE_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            HOME_PAGE_URL,
+            HTTP_IF_MODIFIED_SINCE=self.response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_menu_etag_changes_with_catalogue_search_and_user(self) -> None:
+        etag = self.response["ETag"]
+        search = self.client.get(HOME_PAGE_URL, {"search": "Veggie"})
+        self.assertNotEqual(search["ETag"], etag)
+
+        self.client.login(username="test_user", password="password12345")
+        logged_in = self.client.get(HOME_PAGE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(logged_in.status_code, 200)
+        self.assertIn("private", logged_in["Cache-Control"])
+
+        self.client.logout()
+        Pizza.objects.create(name="Hawaiian", base_price=120)
+        response = self.client.get(HOME_PAGE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Hawaiian")
+
+    def test_custom_pizza_change_revalidates_only_its_owner(self) -> None:
+        veggie = Pizza.objects.get(name="Veggie")
+        anonymous_etag = self.response["ETag"]
+        self.client.login(username="test_user", password="password12345")
+        owner_etag = self.client.get(HOME_PAGE_URL)["ETag"]
+
+        veggie.base_price = 120
+        veggie.save()
+
+        response = self.client.get(
+            HOME_PAGE_URL, HTTP_IF_NONE_MATCH=owner_etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.logout()
+        response = self.client.get(
+            HOME_PAGE_URL, HTTP_IF_NONE_MATCH=anonymous_etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_moving_a_pizza_off_the_menu_revalidates_it(self) -> None:
+        etag = self.response["ETag"]
+        pepperoni = Pizza.objects.get(name="Pepperoni")
+
+        pepperoni.user = self.user
+        pepperoni.save()
+
+        response = self.client.get(HOME_PAGE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Pepperoni")
+
+    def test_menu_cache_stats_for_staff_only(self) -> None:
+        url = reverse("pizza:menu-cache-stats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.login(username="test_user", password="password12345")
+        stats = self.client.get(url).json()
+        self.assertGreaterEqual(stats["page_misses"], 1)
+
+
+class MenuPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
+        # Own pizzas interleave with shared ones in id order
+        for number in range(60):
+            Pizza.objects.create(
+                name=f"Pizza {number}",
+                base_price=100,
+                user=cls.user if number % 3 == 0 else None,
+            )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def collect_pages(self) -> list:
+        # Cleared so every page is rendered and has a context
+        cache.clear()
+        names = []
+        response = self.client.get(HOME_PAGE_URL)
+        names.extend(pizza.name for pizza in response.context["pizza_list"])
+        while response.context["next_cursor"]:
+            cache.clear()
+            response = self.client.get(
+                response.context["next_fragment_url"]
+            )
+            self.assertTemplateUsed(response, "pizza/menu_page.html")
+            self.assertTemplateNotUsed(response, "base.html")
+            names.extend(
+                pizza.name for pizza in response.context["pizza_list"]
+            )
+        return names
+
+    def test_anonymous_pages_cover_shared_pizzas_once(self) -> None:
+        response = self.client.get(HOME_PAGE_URL)
+
+        self.assertEqual(len(response.context["pizza_list"]), 24)
+        self.assertContains(response, 'data-fragment-url="/menu/page/?after=')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertEqual(
+            self.collect_pages(),
+            [
+                f"Pizza {number}"
+                for number in range(60)
+                if number % 3 != 0
+            ],
+        )
+
+    def test_logged_in_pages_merge_own_and_shared_pizzas(self) -> None:
+        self.client.force_login(self.user)
+
+        self.assertEqual(
+            self.collect_pages(),
+            [f"Pizza {number}" for number in range(60)],
+        )
+
+    def test_page_size_bounds_queries_and_rows(self) -> None:
+        self.client.force_login(self.user)
+        Pizza.objects.bulk_create(
+            Pizza(name=f"Custom {number}", base_price=100, user=self.user)
+            for number in range(100)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(HOME_PAGE_URL)
+
+        self.assertEqual(len(response.context["pizza_list"]), 24)
+        menu_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "pizza_pizza"' in query["sql"]
+        ]
+        self.assertEqual(len(menu_queries), 2)
+        for sql in menu_queries:
+            self.assertIn("LIMIT 25", sql)
+
+    def test_search_pages_keep_relevance_order(self) -> None:
+        first = self.client.get(
+            HOME_PAGE_URL, {"search": "pizza", "after": ""}
+        )
+        self.assertIn("search=pizza", first.context["next_page_url"])
+
+        second = self.client.get(first.context["next_page_url"])
+
+        names = [
+            pizza.name
+            for response in (first, second)
+            for pizza in response.context["pizza_list"]
+        ]
+        self.assertEqual(len(names), 40)
+        self.assertEqual(len(set(names)), 40)
+        self.assertIsNone(second.context["next_cursor"])
+
+    def test_postgres_rank_keeps_cursor_precision(self) -> None:
+        queryset = PostgresSearchBackend().search(Pizza.objects.all(), "pizza")
+
+        rank = queryset.query.annotations["search_rank"]
+        # A float4 rank would round-trip through the cursor inexactly
+        self.assertIn("::double precision", rank.sql)
+
+    def test_invalid_cursor_is_not_found(self) -> None:
+        response = self.client.get(
+            reverse("pizza:menu-page"), {"after": "not-a-cursor"}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
 
 class OrderPizzaViewTests(TestCase):
     @classmethod
@@ -62,6 +301,8 @@ class OrderPizzaViewTests(TestCase):
             password="test_pass"
         )
         cls.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        # Test storage has no image files to resize
+        Task.objects.filter(name="generate_renditions").delete()
         PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
         PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.5)
         PizzaSize.objects.create(name="Big", weight=700, multiplier=2.0)
@@ -73,28 +314,380 @@ class OrderPizzaViewTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertTrue(response.url.startswith('/accounts/login/'))
 
-    def test_post_adds_price_to_session_and_redirects(self) -> None:
+    def test_post_adds_line_to_cart_and_redirects(self) -> None:
         self.client.login(username='test_user', password='test_pass')
         response = self.client.post(
             reverse(
                 'pizza:order-pizza',
                 kwargs={'pk': self.pizza.pk}),
-            data={'pizza_price': '10.50'}
+            data={'size': 'Medium', 'quantity': '2', 'pizza_price': '1'}
+        )
+        self.assertRedirects(response, reverse('pizza:cart'))
+        self.assertEqual(
+            self.client.session['cart'],
+            [[self.pizza.pk, 'Medium', 2]]
         )
-        self.assertEqual(response.status_code, 302)
-        self.assertEqual(response.url, reverse(
-            'pizza:order-pizza', kwargs={'pk': self.pizza.pk})
-                         )
-        self.assertEqual(self.client.session['pizza_price'], '10.50')
 
-    def test_pizza_price_added_to_context_data(self) -> None:
+    def test_unchecking_every_ingredient_prices_an_empty_pizza(
+        self,
+    ) -> None:
+        tomato = Ingredient.objects.create(name="Tomato", description="")
+        self.pizza.ingredients.add(tomato)
         self.client.login(username='test_user', password='test_pass')
-        session = self.client.session
-        session['pizza_price'] = '10.50'
-        session.save()
 
-        response = self.client.get(
-            reverse('pizza:order-pizza', kwargs={'pk': self.pizza.pk})
+        self.client.post(
+            reverse('pizza:order-pizza', kwargs={'pk': self.pizza.pk}),
+            data={'size': 'Small', 'customised': '1'},
         )
+        response = self.client.get(reverse('pizza:cart'))
+
+        self.assertEqual(
+            self.client.session['cart'], [[self.pizza.pk, 'Small', 1, {}]]
+        )
+        self.assertEqual(response.context['cart_total'], 90)
+
+    def test_checkout_creates_order_with_server_side_total(self) -> None:
+        other_pizza = Pizza.objects.create(name="Pepperoni", base_price=120)
+        self.client.login(username='test_user', password='test_pass')
+        for pizza, size in ((self.pizza, 'Big'), (other_pizza, 'Small')):
+            self.client.post(
+                reverse('pizza:order-pizza', kwargs={'pk': pizza.pk}),
+                data={'size': size, 'pizza_price': '1'}
+            )
+
+        response = self.client.post(
+            reverse('pizza:order-confirmation'), data={'pizza_price': '1'}
+        )
+
+        self.assertRedirects(response, reverse('pizza:user-orders'))
+        order = Order.objects.get(customer=self.user)
+        self.assertEqual(order.total_price, 320)
+        self.assertEqual(order.orderpizza_set.count(), 2)
+        self.assertEqual(self.client.session['cart'], [])
+
+    def test_checkout_updates_daily_sales_rollup(self) -> None:
+        self.client.login(username='test_user', password='test_pass')
+        for quantity in (2, 1):
+            self.client.post(
+                reverse('pizza:order-pizza', kwargs={'pk': self.pizza.pk}),
+                data={'size': 'Big', 'quantity': quantity}
+            )
+            self.client.post(reverse('pizza:order-confirmation'))
+        self.assertFalse(DailyPizzaSales.objects.exists())
+
+        run_pending_tasks()
+
+        sales = DailyPizzaSales.objects.get()
+        self.assertEqual(sales.pizza, self.pizza)
+        self.assertEqual(sales.size_name, "Big")
+        self.assertEqual(sales.orders, 2)
+        self.assertEqual(sales.quantity, 3)
+        self.assertEqual(sales.revenue, 600)
+
+    def test_checkout_snapshots_price_size_and_ingredient_deltas(
+        self
+    ) -> None:
+        basil = Ingredient.objects.create(name="Basil", description="Green")
+        self.client.login(username='test_user', password='test_pass')
+        self.client.post(
+            reverse('pizza:order-pizza', kwargs={'pk': self.pizza.pk}),
+            data={
+                'size': 'Big',
+                'ingredients': [basil.id],
+                f'ingredient_qty_{basil.id}': '2',
+            }
+        )
+        self.client.post(reverse('pizza:order-confirmation'))
+
+        self.pizza.base_price = 500
+        self.pizza.save()
+
+        line = OrderPizza.objects.get(order__customer=self.user)
+        self.assertEqual(line.pizza_name, "Margarita")
+        self.assertEqual(line.size_name, "Big")
+        self.assertEqual(line.size, PizzaSize.objects.get(name="Big"))
+        self.assertEqual(line.unit_price, 220)
+        self.assertEqual(line.ingredient_deltas, {str(basil.id): 2})
+
+    def test_checkout_merges_lines_that_order_the_same_pizza(self) -> None:
+        tomato = Ingredient.objects.create(name="Tomato", description="")
+        self.pizza.ingredients.add(tomato)
+        self.client.login(username='test_user', password='test_pass')
+        url = reverse('pizza:order-pizza', kwargs={'pk': self.pizza.pk})
+        self.client.post(url, data={'size': 'Big'})
+        # Explicitly picking the base ingredients is a separate cart line
+        self.client.post(
+            url,
+            data={
+                'size': 'Big',
+                'ingredients': [tomato.id],
+                f'ingredient_qty_{tomato.id}': '1',
+            }
+        )
+        self.client.post(url, data={'size': 'Small'})
+        self.assertEqual(len(self.client.session['cart']), 3)
+
+        self.client.post(reverse('pizza:order-confirmation'))
+
+        lines = OrderPizza.objects.filter(
+            order__customer=self.user
+        ).order_by("size_name")
+        self.assertEqual(
+            [(line.size_name, line.quantity) for line in lines],
+            [("Big", 2), ("Small", 1)],
+        )
+
+
+class PizzaDetailViewTests(TestCase):
+    def setUp(self) -> None:
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.5)
+        cheese = IngredientType.objects.create(name="Cheese")
+        self.mozzarella = Ingredient.objects.create(
+            name="Mozzarella", description="Soft", ingredient_type=cheese
+        )
+        self.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        self.pizza.ingredients.add(self.mozzarella)
+        self.url = reverse("pizza:pizza-detail", kwargs={"pk": self.pizza.pk})
+
+    def test_get_prices_the_selected_size(self) -> None:
+        response = self.client.get(self.url, {"size": "Medium"})
+
+        self.assertEqual(response.context["size"], "Medium")
+        self.assertEqual(
+            response.context["pizza_prices"], {"Small": 100, "Medium": 150}
+        )
+        self.assertContains(response, "Medium: 150 UAH")
+
+    def test_unknown_size_falls_back_to_first_size(self) -> None:
+        for params in ({}, {"size": "Huge"}):
+            response = self.client.get(self.url, params)
+            self.assertContains(response, "Small: 100 UAH")
+
+    def test_post_redirects_to_size_query_string(self) -> None:
+        response = self.client.post(self.url, {"size": "Medium"})
+
+        self.assertRedirects(
+            response, f"{self.url}?size=Medium", status_code=303
+        )
+
+    def test_menu_links_sizes_to_cacheable_get(self) -> None:
+        response = self.client.get(HOME_PAGE_URL)
+
+        self.assertContains(response, f'href="{self.url}?size=Medium"')
+
+    def test_warm_catalogue_costs_no_catalogue_queries(self) -> None:
+        self.client.get(self.url, {"size": "Small"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"size": "Small"})
+
+        self.assertEqual(response.context["cheese"], [self.mozzarella])
+        self.assertFalse(
+            any(
+                "pizza_ingredienttype" in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+        self.assertEqual(len(queries), 2)
+
+    def test_catalogue_refreshed_after_ingredient_change(self) -> None:
+        self.client.get(self.url, {"size": "Small"})
+        self.mozzarella.name = "Buffalo Mozzarella"
+        self.mozzarella.save()
+
+        response = self.client.get(self.url, {"size": "Small"})
+
+        self.assertEqual(
+            response.context["cheese"][0].name, "Buffalo Mozzarella"
+        )
+
+
+class ShowUpdatedPizzaTests(TestCase):
+    def setUp(self) -> None:
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.5)
+        self.mozzarella = Ingredient.objects.create(
+            name="Mozzarella", description="Soft"
+        )
+        self.basil = Ingredient.objects.create(
+            name="Basil", description="Green"
+        )
+        self.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        self.pizza.ingredients.add(self.mozzarella)
+        self.url = reverse(
+            "pizza:update-pizza-ingredients", kwargs={"pk": self.pizza.pk}
+        )
+
+    def test_recalculates_prices_for_added_ingredients(self) -> None:
+        response = self.client.post(
+            self.url,
+            {
+                "size": "Small",
+                "ingredients": [self.mozzarella.id, self.basil.id],
+                f"ingredient_qty_{self.mozzarella.id}": "2",
+            },
+        )
+        self.assertEqual(
+            response.context["pizza_prices"], {"Small": 120, "Medium": 170}
+        )
+        updated_ingredients = response.context["updated_ingredients"]
+        self.assertEqual(
+            [row["quantity"] for row in updated_ingredients], [1, 2]
+        )
+
+    def test_warm_recalculation_issues_no_queries(self) -> None:
+        data = {"size": "Small", "ingredients": [self.basil.id]}
+        self.client.post(self.url, data)
+
+        with self.assertNumQueries(0):
+            self.client.post(self.url, data)
+
+    def test_invalid_quantity_is_rejected(self) -> None:
+        response = self.client.post(
+            self.url,
+            {
+                "ingredients": [self.basil.id],
+                f"ingredient_qty_{self.basil.id}": "lots",
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class PizzaPricesTests(TestCase):
+    def setUp(self) -> None:
+        PizzaSize.objects.create(name="Small", weight=300, multiplier=1.0)
+        PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.5)
+        cheese = IngredientType.objects.create(name="Cheese")
+        self.mozzarella = Ingredient.objects.create(
+            name="Mozzarella", description="Soft", ingredient_type=cheese
+        )
+        self.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        self.pizza.ingredients.add(self.mozzarella)
+        self.url = reverse("pizza:pizza-prices", kwargs={"pk": self.pizza.pk})
+
+    def test_returns_price_matrix_and_catalogue(self) -> None:
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            response.json(),
+            {
+                "pizza": {
+                    "id": self.pizza.id,
+                    "name": "Margarita",
+                    "ingredients": [self.mozzarella.id],
+                },
+                "prices": {"Small": 100, "Medium": 150},
+                "ingredient_price": 10,
+                "ingredient_types": [
+                    {
+                        "name": "Cheese",
+                        "ingredients": [
+                            {"id": self.mozzarella.id, "name": "Mozzarella"}
+                        ],
+                    }
+                ],
+            },
+        )
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+    def test_matching_etag_returns_304_without_queries(self) -> None:
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_catalogue_change_issues_a_new_etag(self) -> None:
+        etag = self.client.get(self.url)["ETag"]
+        self.pizza.base_price = 120
+        self.pizza.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.context['pizza_price'], '10.50')
+        self.assertEqual(response.json()["prices"]["Small"], 120)
+
+    def test_custom_pizza_change_issues_a_new_etag(self) -> None:
+        user = CustomUser.objects.create_user(
+            username="test_user", password="password12345"
+        )
+        custom = Pizza.objects.create(
+            name="My Margarita", base_price=100, user=user
+        )
+        url = reverse("pizza:pizza-prices", kwargs={"pk": custom.pk})
+        etag = self.client.get(url)["ETag"]
+        public_etag = self.client.get(self.url)["ETag"]
+        custom.ingredients.add(self.mozzarella)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["pizza"]["ingredients"], [self.mozzarella.id]
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=public_etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_pizza_returns_404(self) -> None:
+        response = self.client.get(
+            reverse("pizza:pizza-prices", kwargs={"pk": 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class CustomUserOrdersViewTests(TestCase):
+    def setUp(self) -> None:
+        self.user = CustomUser.objects.create_user(
+            username="test_user", password="test_pass"
+        )
+        PizzaSize.objects.create(name="Medium", weight=500, multiplier=1.0)
+        PizzaSize.objects.create(name="Big", weight=700, multiplier=1.5)
+        self.pizza = Pizza.objects.create(name="Margarita", base_price=100)
+        self.client.login(username="test_user", password="test_pass")
+
+    def create_orders(self, count) -> None:
+        for _ in range(count):
+            order = Order.objects.create(customer=self.user, total_price=200)
+            OrderPizza.objects.create(
+                order=order, pizza=self.pizza, quantity=2, unit_price=100
+            )
+
+    def test_query_count_does_not_grow_with_history(self) -> None:
+        self.create_orders(3)
+        with CaptureQueriesContext(connection) as short_history:
+            self.client.get(USER_ORDERS_URL)
+
+        self.create_orders(40)
+        with CaptureQueriesContext(connection) as long_history:
+            self.client.get(USER_ORDERS_URL)
+
+        self.assertEqual(len(short_history), len(long_history))
+
+    def test_keyset_pages_cover_every_order_once(self) -> None:
+        self.create_orders(45)
+        seen = []
+        cursor = None
+        while True:
+            response = self.client.get(
+                USER_ORDERS_URL, {"after": cursor} if cursor else {}
+            )
+            seen.extend(order.id for order in response.context["object_list"])
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(
+            seen,
+            list(
+                Order.objects.order_by("-order_date", "-id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
+    def test_invalid_cursor_returns_404(self) -> None:
+        response = self.client.get(USER_ORDERS_URL, {"after": "bogus"})
+        self.assertEqual(response.status_code, 404)
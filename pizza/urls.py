@@ -1,41 +1,83 @@
+from django.conf import settings
 from django.urls import path
 
 from pizza.views import (
+    AsyncPizzaDetailView,
+    AsyncPizzaListView,
     PizzaListView,
     CustomUserCreateView,
     PizzaDetailView,
+    ashow_updated_pizza,
     show_updated_pizza,
+    menu_cache_stats,
+    pizza_prices,
     OrderPizzaView,
+    CartView,
     OrderConfirmationView,
     CustomUserOrdersView,
     ProfileCustomUserView,
     CustomPizzaCreateView,
 )
 
-urlpatterns = [
-    path("", PizzaListView.as_view(), name="home-page"),
-    path(
-        "users/create/",
-        CustomUserCreateView.as_view(),
-        name="customuser-create",
-    ),
-    path("detail/<int:pk>/", PizzaDetailView.as_view(), name="pizza-detail"),
-    path(
-        "pizza/<int:pk>/update_ingredients/",
-        show_updated_pizza,
-        name="update-pizza-ingredients",
-    ),
-    path("order/<int:pk>/", OrderPizzaView.as_view(), name="order-pizza"),
-    path(
-        "order-confirmation/",
-        OrderConfirmationView.as_view(),
-        name="order-confirmation",
-    ),
-    path("my-orders/", CustomUserOrdersView.as_view(), name="user-orders"),
-    path("my-profile/", ProfileCustomUserView.as_view(), name="profile"),
-    path(
-        "custom-pizza/", CustomPizzaCreateView.as_view(), name="custom-pizza"
-    ),
-]
+
+# The menu read path has async views for ASGI deployments
+def get_urlpatterns(async_views=False) -> list:
+    if async_views:
+        list_view = AsyncPizzaListView
+        detail_view = AsyncPizzaDetailView
+        update_view = ashow_updated_pizza
+    else:
+        list_view = PizzaListView
+        detail_view = PizzaDetailView
+        update_view = show_updated_pizza
+
+    return [
+        path("", list_view.as_view(), name="home-page"),
+        path(
+            "menu/page/",
+            list_view.as_view(template_name="pizza/menu_page.html"),
+            name="menu-page",
+        ),
+        path(
+            "users/create/",
+            CustomUserCreateView.as_view(),
+            name="customuser-create",
+        ),
+        path(
+            "detail/<int:pk>/", detail_view.as_view(), name="pizza-detail"
+        ),
+        path(
+            "pizza/<int:pk>/update_ingredients/",
+            update_view,
+            name="update-pizza-ingredients",
+        ),
+        path(
+            "pizza/<int:pk>/prices.json",
+            pizza_prices,
+            name="pizza-prices",
+        ),
+        path("order/<int:pk>/", OrderPizzaView.as_view(), name="order-pizza"),
+        path("cart/", CartView.as_view(), name="cart"),
+        path(
+            "order-confirmation/",
+            OrderConfirmationView.as_view(),
+            name="order-confirmation",
+        ),
+        path(
+            "my-orders/", CustomUserOrdersView.as_view(), name="user-orders"
+        ),
+        path("my-profile/", ProfileCustomUserView.as_view(), name="profile"),
+        path(
+            "custom-pizza/",
+            CustomPizzaCreateView.as_view(),
+            name="custom-pizza",
+        ),
+        path(
+            "stats/menu-cache/", menu_cache_stats, name="menu-cache-stats"
+        ),
+    ]
+
+
+urlpatterns = get_urlpatterns(settings.PIZZA_ASYNC_VIEWS)
 
 app_name = "pizza"
@@ -1,13 +1,31 @@
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db.models import Q, QuerySet
-from django.http import HttpResponse
-from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+)
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag, urlencode
 from django.views import generic
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 
+from pizza.cart import Cart, build_order_pizzas
+from pizza.catalogue import get_catalogue, get_catalogue_state
+from pizza.conditional import catalogue_conditional
 from pizza.forms import (
     CustomUserCreationForm,
     ProfileCustomUserForm,
@@ -16,16 +34,68 @@ from pizza.forms import (
 from pizza.models import (
     Pizza,
     CustomUser,
-    Ingredient,
-    IngredientType,
     Order,
     OrderPizza,
+    PizzaSize,
+)
+from pizza.menu_cache import (
+    cache_menu_page,
+    get_cached_menu_page,
+    get_menu_cache_stats,
+)
+from pizza.pagination import (
+    apaginate_by_keyset,
+    apaginate_union_by_keyset,
+    paginate_by_keyset,
+    paginate_union_by_keyset,
+)
+from pizza.recalculation import (
+    arecalculate_pizza,
+    get_ingredient_quantities,
+    get_pizza_summary,
+    get_price_payload,
+    recalculate_pizza,
 )
+from pizza.search import get_search_backend
+from pizza.task_queue import enqueue
+
+PRICES_MAX_AGE = 60
 
 
 class PizzaListView(generic.ListView):
+    """
+    The menu, one keyset page at a time. With ``template_name`` set to
+    ``pizza/menu_page.html`` it serves only the cards of a page, which
+    the menu appends as the visitor scrolls.
+    """
+
     model = Pizza
     template_name = "pizza/index.html"
+    context_object_name = "pizza_list"
+    page_size = 24
+
+    @catalogue_conditional
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        if request.user.is_authenticated:
+            return self.render_menu_page()
+
+        page = self.get_page_identity()
+        content = get_cached_menu_page(page)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = self.render_menu_page()
+        response.add_post_render_callback(
+            lambda rendered: cache_menu_page(page, rendered.content)
+        )
+        return response
+
+    def get_page_identity(self) -> tuple:
+        return (
+            self.template_name,
+            self.request.GET.get("search", ""),
+            self.request.GET.get("after", ""),
+        )
 
     def get_queryset(self) -> QuerySet["Pizza"]:
         search_query = self.request.GET.get("search", "")
@@ -39,20 +109,99 @@ class PizzaListView(generic.ListView):
             queryset = Pizza.objects.filter(user__isnull=True)
 
         if search_query:
-            pizzas = Pizza.objects.filter(name__icontains=search_query)
-            ingredient_pizzas = Pizza.objects.filter(
-                ingredients__name__icontains=search_query
+            queryset = get_search_backend().search(queryset, search_query)
+
+        return queryset.with_prices()
+
+    def get_page_querysets(self) -> tuple:
+        """Querysets the menu page is merged from and their ordering."""
+        user = self.request.user
+        if user.is_authenticated and not self.request.GET.get("search"):
+            # Shared and own pizzas are two index range scans that stop
+            # after a page, however many custom pizzas the user has
+            querysets = [
+                Pizza.objects.filter(user__isnull=True).with_prices(),
+                Pizza.objects.filter(user=user)
+                .select_related("user")
+                .with_prices(),
+            ]
+            return querysets, Pizza._meta.ordering
+
+        queryset = self.get_queryset()
+        # Search results keep their relevance order
+        return [queryset], queryset.query.order_by or Pizza._meta.ordering
+
+    def get_menu_page(self) -> tuple:
+        """Pizzas after the ``after`` cursor and the next page's cursor."""
+        querysets, ordering = self.get_page_querysets()
+        cursor = self.request.GET.get("after")
+        if len(querysets) > 1:
+            return paginate_union_by_keyset(
+                querysets, ordering, cursor, self.page_size
+            )
+        return paginate_by_keyset(
+            querysets[0], ordering, cursor, self.page_size
+        )
+
+    async def aget_menu_page(self) -> tuple:
+        querysets, ordering = self.get_page_querysets()
+        cursor = self.request.GET.get("after")
+        if len(querysets) > 1:
+            return await apaginate_union_by_keyset(
+                querysets, ordering, cursor, self.page_size
             )
-            queryset = (pizzas | ingredient_pizzas).distinct()
+        return await apaginate_by_keyset(
+            querysets[0], ordering, cursor, self.page_size
+        )
 
-        return queryset
+    def render_menu_page(self) -> HttpResponse:
+        self.object_list, self.next_cursor = self.get_menu_page()
+        return self.render_to_response(self.get_context_data())
 
     def get_context_data(self, **kwargs) -> dict:
         context = super().get_context_data(**kwargs)
-        context["search_query"] = self.request.GET.get("search", "")
+        search_query = self.request.GET.get("search", "")
+        context["search_query"] = search_query
+        context["next_cursor"] = self.next_cursor
+        if self.next_cursor:
+            query = {"after": self.next_cursor}
+            if search_query:
+                query = {"search": search_query, **query}
+            context["next_page_url"] = (
+                f"{reverse('pizza:home-page')}?{urlencode(query)}"
+            )
+            context["next_fragment_url"] = (
+                f"{reverse('pizza:menu-page')}?{urlencode(query)}"
+            )
         return context
 
 
+# Django 4.2 has no request.auser(); resolve the lazy user off the loop
+async def ais_authenticated(request) -> bool:
+    return await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+class AsyncPizzaListView(PizzaListView):
+    @catalogue_conditional
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        is_authenticated = await ais_authenticated(request)
+        page = self.get_page_identity()
+        if not is_authenticated:
+            content = await sync_to_async(get_cached_menu_page)(page)
+            if content is not None:
+                return HttpResponse(content)
+
+        # The user is resolved above, so building the querysets runs no
+        # query; the pages themselves are read with async for
+        self.object_list, self.next_cursor = await self.aget_menu_page()
+        response = self.render_to_response(self.get_context_data())
+        if not is_authenticated:
+            response.add_post_render_callback(
+                lambda rendered: cache_menu_page(page, rendered.content)
+            )
+        return response
+
+
 class CustomUserCreateView(generic.CreateView):
     model = CustomUser
     form_class = CustomUserCreationForm
@@ -66,123 +215,165 @@ class CustomUserCreateView(generic.CreateView):
         return response
 
 
+# Menu pages cached before size links became GETs still POST the size;
+# those are redirected and need no CSRF token
+@method_decorator(csrf_exempt, name="dispatch")
 class PizzaDetailView(generic.DetailView):
-    model = Pizza
+    """
+    Pizza page priced for the ``?size=`` in the query string. The pizza
+    and its ingredients are fetched once; sizes and the ingredient
+    catalogue come from cache.
+    """
+
+    queryset = Pizza.objects.prefetch_related("ingredients")
+
+    @catalogue_conditional
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs) -> HttpResponse:
-        size = request.POST.get("size", "small")
-        self.object = self.get_object()
-        pizza = get_object_or_404(Pizza, id=kwargs["pk"])
-        pizza_prices = pizza.get_prices()
-        context = self.get_context_data(
-            object=self.object, size=size, pizza_prices=pizza_prices
-        )
-        return self.render_to_response(context)
+        return redirect_to_size(request, kwargs["pk"])
 
     def get_context_data(self, **kwargs) -> dict:
         context = super().get_context_data(**kwargs)
-        context["size"] = kwargs.get("size", "small")
-        context["pizza_price"] = kwargs.get("pizza_prices")
-        ingredient_types = IngredientType.objects.all().prefetch_related(
-            "ingredients"
-        )
-
-        context.update(
-            {
-                ingredient_type.name.lower().replace(
-                    " ", "_"
-                ): ingredient_type.ingredients.all()
-                for ingredient_type in ingredient_types
-            }
-        )
-
+        multipliers = PizzaSize.get_multipliers()
+        size = self.request.GET.get("size")
+        if size not in multipliers:
+            size = next(iter(multipliers), "")
+
+        context["size"] = size
+        context["pizza_prices"] = self.object.get_prices(multipliers)
+        context["pizza_ingredient_ids"] = {
+            ingredient.id for ingredient in self.object.ingredients.all()
+        }
+        context.update(get_catalogue().get_ingredients_by_slug())
         return context
 
 
-"""
-The main logic that calculates changes in the number of ingredients
-that the client changes
-"""
-
-
-# Price change if ingredients are added or removed
-def get_updated_pizza_prices(pizza_prices, price_difference) -> dict:
-    if price_difference != 0:
-        return {
-            key: price + price_difference * 10
-            for key, price in pizza_prices.items()
-        }
-    return pizza_prices
-
+def redirect_to_size(request, pizza_id) -> HttpResponse:
+    url = reverse("pizza:pizza-detail", kwargs={"pk": pizza_id})
+    size = request.POST.get("size")
+    if size:
+        url = f"{url}?{urlencode({'size': size})}"
+    return HttpResponseRedirect(url, status=303)
+
+
+class AsyncPizzaDetailView(PizzaDetailView):
+    @catalogue_conditional
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        try:
+            self.object = await self.get_queryset().aget(pk=kwargs["pk"])
+        except Pizza.DoesNotExist:
+            raise Http404("No pizza found matching the query")
+        # Size table and catalogue are cache-first sync helpers
+        context = await sync_to_async(self.get_context_data)(
+            object=self.object
+        )
+        return self.render_to_response(context)
 
-# Dictionary of new quantities ingredients
-def get_ingredient_quantity_dict(selected_ingredients, request) -> dict:
-    ingredient_quantities = {
-        ingredient_id: request.POST.get(f"ingredient_qty_{ingredient_id}", 1)
-        for ingredient_id in selected_ingredients
-    }
-    ingredients = Ingredient.objects.filter(id__in=ingredient_quantities.keys())
-    return {
-        str(ing.id): ingredient_quantities[str(ing.id)] for ing in ingredients
-    }
+    async def post(self, request, *args, **kwargs) -> HttpResponse:
+        return redirect_to_size(request, kwargs["pk"])
 
 
 # Show full updated ingredients and price
 def show_updated_pizza(request, *args, **kwargs) -> HttpResponse:
-    pizza = get_object_or_404(
-        Pizza.objects.prefetch_related("ingredients"), id=kwargs["pk"]
-    )
-    pizza_prices = pizza.get_prices()
+    try:
+        context = recalculate_pizza(
+            kwargs["pk"], request.POST.get("size"), request.POST
+        )
+    except ValidationError as error:
+        return HttpResponseBadRequest(error.messages[0])
 
-    base_ingredients_quantity = pizza.ingredients.values_list(
-        "name", flat=True
-    ).count()
+    return TemplateResponse(
+        request, "pizza/update_pizza_detail.html", context
+    )
 
-    selected_ingredients = request.POST.getlist("ingredients")
-    ingredient_quantity_dict = get_ingredient_quantity_dict(
-        selected_ingredients, request)
 
-    updated_ingredients = [
-        {
-            "ingredient": ingredient,
-            "quantity": ingredient_quantity_dict[str(ingredient.id)],
-        }
-        for ingredient in Ingredient.objects.filter(
-            id__in=ingredient_quantity_dict.keys()
+async def ashow_updated_pizza(request, *args, **kwargs) -> HttpResponse:
+    try:
+        context = await arecalculate_pizza(
+            kwargs["pk"], request.POST.get("size"), request.POST
         )
-    ]
+    except ValidationError as error:
+        return HttpResponseBadRequest(error.messages[0])
 
-    pizza_size = request.POST.get("size")
-
-    updated_ingredients_quantity = sum(
-        int(ingredient["quantity"]) for ingredient in updated_ingredients
+    return TemplateResponse(
+        request, "pizza/update_pizza_detail.html", context
     )
-    price_difference = updated_ingredients_quantity - base_ingredients_quantity
-    updated_prices = get_updated_pizza_prices(pizza_prices, price_difference)
 
-    context = {
-        "pizza": pizza,
-        "updated_ingredients": updated_ingredients,
-        "pizza_size": pizza_size,
-        "pizza_prices": updated_prices,
-    }
 
-    return render(request, "pizza/update_pizza_detail.html", context)
+# Prices and catalogue for client-side recalculation; revalidated by
+# catalogue version and, for a custom pizza, its owner's version, so an
+# unchanged pizza costs two cache reads
+@require_GET
+def pizza_prices(request, pk) -> HttpResponse:
+    owner_id = get_pizza_summary(pk).user_id
+    version, _ = get_catalogue_state([owner_id] if owner_id else [])
+    etag = quote_etag(f"{version}-{pk}")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(get_price_payload(pk, version))
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=PRICES_MAX_AGE)
+    return response
+
 
+@staff_member_required
+def menu_cache_stats(request) -> JsonResponse:
+    return JsonResponse(get_menu_cache_stats())
 
-class OrderPizzaView(LoginRequiredMixin, generic.DetailView):
+
+class OrderPizzaView(
+    LoginRequiredMixin, generic.detail.SingleObjectMixin, generic.View
+):
     model = Pizza
-    template_name = "pizza/order_pizza.html"
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        return redirect("pizza:cart")
 
     def post(self, request, *args, **kwargs) -> HttpResponse:
         pizza = self.get_object()
-        pizza_price = self.request.POST.get("pizza_price")
-        request.session["pizza_price"] = pizza_price
-        return redirect("pizza:order-pizza", pk=pizza.id)
+        size = request.POST.get("size")
+        if size not in PizzaSize.get_multipliers():
+            return HttpResponseBadRequest("Unknown pizza size")
+
+        try:
+            quantity = int(request.POST.get("quantity", 1))
+            ingredients = None
+            # Unchecking every ingredient sends no "ingredients" at all;
+            # "customised" tells that apart from the base recipe
+            if "customised" in request.POST or "ingredients" in request.POST:
+                ingredients = {
+                    ingredient.id: ingredient_quantity
+                    for ingredient, ingredient_quantity
+                    in get_ingredient_quantities(
+                        request.POST.getlist("ingredients"), request.POST
+                    ).items()
+                }
+        except (TypeError, ValueError, ValidationError):
+            return HttpResponseBadRequest("Invalid quantity")
+        if quantity < 1:
+            return HttpResponseBadRequest("Invalid quantity")
+
+        Cart(request.session).add(pizza.id, size, quantity, ingredients)
+        return redirect("pizza:cart")
+
+
+class CartView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pizza/cart.html"
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        try:
+            Cart(request.session).remove(int(request.POST.get("remove")))
+        except (TypeError, ValueError):
+            return HttpResponseBadRequest("Invalid cart line")
+        return redirect("pizza:cart")
 
     def get_context_data(self, **kwargs) -> dict:
         context = super().get_context_data(**kwargs)
-        context["pizza_price"] = self.request.session.get("pizza_price")
+        lines = Cart(self.request.session).get_lines()
+        context["cart_lines"] = lines
+        context["cart_total"] = sum(line["total_price"] for line in lines)
         return context
 
 
@@ -190,29 +381,53 @@ class OrderConfirmationView(LoginRequiredMixin, generic.View):
     model = Order
 
     def post(self, request, *args, **kwargs) -> HttpResponse:
-        pizza_id = request.POST.get("pizza")
-        pizza = get_object_or_404(Pizza, id=pizza_id)
-
-        quantity = int(request.POST.get("quantity"))
-        pizza_price = float(request.POST.get("pizza_price"))
+        cart = Cart(request.session)
+        lines = cart.get_lines()
+        if not lines:
+            return redirect("pizza:cart")
 
         with transaction.atomic():
             order = Order.objects.create(
-                customer=request.user, total_price=pizza_price * quantity
+                customer=request.user,
+                total_price=sum(line["total_price"] for line in lines),
             )
-            OrderPizza.objects.create(
-                order=order, pizza=pizza, quantity=quantity
+            OrderPizza.objects.bulk_create(build_order_pizzas(order, lines))
+            enqueue(
+                "record_order_sales",
+                {"order_id": order.id},
+                idempotency_key=f"order-sales:{order.id}",
+            )
+            enqueue(
+                "send_order_confirmation",
+                {"order_id": order.id},
+                idempotency_key=f"order-confirmation:{order.id}",
             )
 
+        cart.clear()
         return redirect("pizza:user-orders")
 
 
 class CustomUserOrdersView(LoginRequiredMixin, generic.ListView):
     model = Order
     template_name = "pizza/user_orders.html"
+    page_size = 20
+    ordering = ("-order_date", "-id")
 
     def get_queryset(self) -> QuerySet["Order"]:
-        return Order.objects.filter(customer=self.request.user)
+        return Order.objects.filter(
+            customer=self.request.user
+        ).prefetch_related("orderpizza_set")
+
+    def get_context_data(self, **kwargs) -> dict:
+        orders, next_cursor = paginate_by_keyset(
+            self.object_list,
+            self.ordering,
+            self.request.GET.get("after"),
+            self.page_size,
+        )
+        context = super().get_context_data(object_list=orders, **kwargs)
+        context["next_cursor"] = next_cursor
+        return context
 
 
 class ProfileCustomUserView(LoginRequiredMixin, generic.UpdateView):
@@ -243,5 +458,5 @@ class CustomPizzaCreateView(LoginRequiredMixin, generic.CreateView):
 
     def get_context_data(self, **kwargs) -> dict:
         context = super().get_context_data(**kwargs)
-        context["ingredient_types"] = IngredientType.objects.all()
+        context["ingredient_groups"] = get_catalogue().get_type_groups()
         return context
@@ -0,0 +1,48 @@
+"""
+Cache backends from ``CACHE_URL``. A ``redis://`` or ``rediss://`` URL
+selects Django's Redis backend, shared by every web and worker process.
+Without one each process has its own in-memory cache: a write in one
+process cannot invalidate entries held by another. Entries that must
+follow database writes then expire after ``LOCAL_CACHE_TIMEOUT`` seconds,
+so other processes serve stale prices or menus for at most that long.
+"""
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+REDIS_BACKEND = "django.core.cache.backends.redis.RedisCache"
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+LOCAL_BACKENDS = (
+    LOCMEM_BACKEND,
+    "django.core.cache.backends.dummy.DummyCache",
+)
+LOCAL_CACHE_TIMEOUT = 60
+
+
+def get_cache_config(environ) -> dict:
+    url = environ.get("CACHE_URL")
+    if not url:
+        return {"default": {"BACKEND": LOCMEM_BACKEND}}
+    if urlparse(url).scheme not in ("redis", "rediss"):
+        raise ImproperlyConfigured("CACHE_URL must be a redis:// URL")
+    return {"default": {"BACKEND": REDIS_BACKEND, "LOCATION": url}}
+
+
+def is_shared_cache(config) -> bool:
+    """Whether a ``CACHES`` entry is seen by every process."""
+    return config["BACKEND"] not in LOCAL_BACKENDS
+
+
+def get_invalidation_timeout(alias="default", timeout=None):
+    """
+    Timeout for an entry other processes must stop serving once the data
+    behind it changes: ``timeout`` with a shared cache, otherwise capped
+    at ``LOCAL_CACHE_TIMEOUT``.
+    """
+    if is_shared_cache(settings.CACHES[alias]):
+        return timeout
+    local_timeout = getattr(
+        settings, "LOCAL_CACHE_TIMEOUT", LOCAL_CACHE_TIMEOUT
+    )
+    return local_timeout if timeout is None else min(timeout, local_timeout)
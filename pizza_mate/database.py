@@ -0,0 +1,59 @@
+"""
+Settings for the ``default`` database. ``DB_CONNECTION_MODE`` picks how
+connections are reused between requests:
+
+``persistent``
+    One connection per worker thread, kept for ``DB_CONN_MAX_AGE`` seconds.
+``pool``
+    A per-process psycopg2 pool (PostgreSQL only) keeping
+    ``DB_POOL_MIN_SIZE`` idle and at most ``DB_POOL_MAX_SIZE`` connections.
+    Each request checks one out and returns it when it finishes.
+``pgbouncer``
+    Persistent connections to a PgBouncer in transaction pooling mode,
+    which cannot hold server-side cursors across transactions.
+``none``
+    A new connection for every request.
+
+Unless ``DB_CONN_HEALTH_CHECKS=False``, a reused connection is checked
+before the first query of each request. A connection the server or a
+proxy has silently closed is then replaced instead of failing a request.
+"""
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+CONNECTION_MODES = ("persistent", "pool", "pgbouncer", "none")
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+POOL_ENGINE = "pizza_mate.postgresql_pool"
+
+
+def get_database_config(environ, default) -> dict:
+    mode = environ.get("DB_CONNECTION_MODE", "persistent")
+    if mode not in CONNECTION_MODES:
+        raise ImproperlyConfigured(
+            f"DB_CONNECTION_MODE must be one of {', '.join(CONNECTION_MODES)}"
+        )
+
+    config = dict(default)
+    if environ.get("DATABASE_URL"):
+        config.update(dj_database_url.parse(environ["DATABASE_URL"]))
+    persistent = mode in ("persistent", "pgbouncer")
+    config["CONN_MAX_AGE"] = (
+        int(environ.get("DB_CONN_MAX_AGE", 600)) if persistent else 0
+    )
+    config["CONN_HEALTH_CHECKS"] = (
+        environ.get("DB_CONN_HEALTH_CHECKS", "True") == "True"
+    )
+
+    if mode == "pgbouncer":
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    elif mode == "pool":
+        if config["ENGINE"] != POSTGRESQL_ENGINE:
+            raise ImproperlyConfigured(
+                "DB_CONNECTION_MODE=pool needs a PostgreSQL DATABASE_URL"
+            )
+        config["ENGINE"] = POOL_ENGINE
+        config["POOL"] = {
+            "min_size": int(environ.get("DB_POOL_MIN_SIZE", 1)),
+            "max_size": int(environ.get("DB_POOL_MAX_SIZE", 4)),
+        }
+    return config
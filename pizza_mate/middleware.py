@@ -0,0 +1,200 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger("pizza_mate.metrics")
+
+METRIC_FIELDS = ("total_ms", "db_ms", "template_ms", "queries", "bytes")
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, percent) -> float:
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+class RequestMetrics:
+    """Rolling window of per-request samples keyed by URL name."""
+
+    def __init__(self, window) -> None:
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, view_name, sample) -> None:
+        with self.lock:
+            self.samples[view_name].append(sample)
+
+    def summary(self) -> dict:
+        with self.lock:
+            samples = {
+                view_name: list(view_samples)
+                for view_name, view_samples in self.samples.items()
+            }
+
+        summary = {}
+        for view_name, view_samples in sorted(samples.items()):
+            view_summary = {"count": len(view_samples)}
+            for field in METRIC_FIELDS:
+                values = sorted(sample[field] for sample in view_samples)
+                view_summary[field] = {
+                    f"p{percent}": percentile(values, percent)
+                    for percent in PERCENTILES
+                }
+            summary[view_name] = view_summary
+        return summary
+
+
+request_metrics = RequestMetrics(
+    getattr(settings, "REQUEST_METRICS_WINDOW", 1000)
+)
+
+
+class QueryTimer:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, DB time, template render time and response size
+    per request, adds a Server-Timing header and logs one JSON line.
+    Removed from the middleware chain unless REQUEST_METRICS_ENABLED.
+    Runs sync or async to match the chain, so async views under ASGI are
+    not switched to a thread for it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.template_ms = 0.0
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        return self.record(request, response, timer, start)
+
+    async def __acall__(self, request):
+        request.template_ms = 0.0
+        timer = QueryTimer()
+        start = time.perf_counter()
+        # Connections are thread-local and the async ORM queries from the
+        # request's thread-sensitive thread, so the timer goes on that one
+        await sync_to_async(
+            lambda: connection.execute_wrappers.append(timer)
+        )()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(
+                lambda: connection.execute_wrappers.remove(timer)
+            )()
+        return self.record(request, response, timer, start)
+
+    def record(self, request, response, timer, start):
+        total_ms = (time.perf_counter() - start) * 1000
+
+        match = request.resolver_match
+        sample = {
+            "total_ms": round(total_ms, 3),
+            "db_ms": round(timer.duration * 1000, 3),
+            "template_ms": round(request.template_ms, 3),
+            "queries": timer.count,
+            "bytes": (
+                0 if response.streaming else len(response.content)
+            ),
+        }
+        view_name = match.view_name if match else "unresolved"
+
+        response["Server-Timing"] = (
+            f'db;dur={sample["db_ms"]};desc="{timer.count} queries", '
+            f'tpl;dur={sample["template_ms"]}, '
+            f'total;dur={sample["total_ms"]}'
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "view": view_name,
+                    "method": request.method,
+                    "status": response.status_code,
+                    **sample,
+                }
+            )
+        )
+        request_metrics.record(view_name, sample)
+        return response
+
+    def process_template_response(self, request, response):
+        # Outermost middleware, so rendering starts right after this hook
+        start = time.perf_counter()
+
+        def record_render_time(rendered_response) -> None:
+            request.template_ms = (time.perf_counter() - start) * 1000
+
+        response.add_post_render_callback(record_render_time)
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise 6.5 is sync-only, which makes Django run every middleware
+    above it sync too. Static lookups are in-memory, so this serves them
+    the same way from either mode and passes other requests on unchanged.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings) -> None:
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,91 @@
+"""
+PostgreSQL backend that checks connections out of a per-process psycopg2
+pool instead of opening one per request. Selected with
+``DB_CONNECTION_MODE=pool``; see ``pizza_mate.database``.
+"""
+import os
+import threading
+
+import psycopg2
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def is_usable(connection) -> bool:
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+class ConnectionPool(pool.ThreadedConnectionPool):
+    """
+    Keeps ``min_size`` idle connections and opens up to ``max_size``.
+    Connections are opened by ``connect`` so they get the same setup as
+    Django's own.
+    """
+
+    def __init__(self, min_size, max_size, connect) -> None:
+        self.connect = connect
+        super().__init__(min_size, max_size)
+
+    def _connect(self, key=None):
+        connection = self.connect()
+        if key is None:
+            self._pool.append(connection)
+        else:
+            self._used[key] = connection
+            self._rused[id(connection)] = key
+        return connection
+
+    def checkout(self, health_check=True):
+        # Idle connections may have been dropped by the server or a proxy;
+        # discard those until one answers or a fresh one is opened
+        for _ in range(self.minconn + 1):
+            connection = self.getconn()
+            if not health_check or is_usable(connection):
+                return connection
+            self.putconn(connection, close=True)
+        return self.getconn()
+
+
+def get_pool(wrapper, conn_params) -> ConnectionPool:
+    # Forked workers must not share their parent's sockets
+    key = (os.getpid(), wrapper.alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            sizes = wrapper.settings_dict.get("POOL", {})
+            _pools[key] = ConnectionPool(
+                sizes.get("min_size", 1),
+                sizes.get("max_size", 4),
+                lambda: wrapper.open_connection(conn_params),
+            )
+        return _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pool = None
+
+    def open_connection(self, conn_params):
+        return super().get_new_connection(conn_params)
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self, conn_params)
+        return self.pool.checkout(self.settings_dict["CONN_HEALTH_CHECKS"])
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Rolls back anything left open and keeps the connection
+                # for the next request unless the pool is already full
+                self.pool.putconn(
+                    self.connection, close=bool(self.connection.closed)
+                )
@@ -0,0 +1,51 @@
+"""
+Session storage picked by ``SESSION_MODE``:
+
+``db`` (the default)
+    Rows in ``django_session`` only, one query per request with a session.
+``cached_db``
+    Rows in ``django_session`` read through the ``SESSION_CACHE_ALIAS``
+    cache. Reads rarely touch the database; every change is still written.
+``cache``
+    The cache only: no database writes, but sessions are lost when the
+    cache evicts or restarts.
+``signed_cookies``
+    The session data itself, signed with ``SECRET_KEY``, in the cookie. No
+    server-side storage; sessions cannot be revoked before they expire.
+
+Both cache-backed modes need ``SESSION_CACHE_ALIAS`` to be a cache shared
+by every process (``CACHE_URL``).
+
+The database-backed modes leave expired rows behind, which the periodic
+``sweep`` task deletes every ``SWEEP_INTERVAL`` seconds.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+from pizza_mate.caches import is_shared_cache
+
+SESSION_ENGINES = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "db": "django.contrib.sessions.backends.db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+DB_SESSION_ENGINES = (SESSION_ENGINES["cached_db"], SESSION_ENGINES["db"])
+CACHE_SESSION_MODES = ("cached_db", "cache")
+
+
+def get_session_engine(mode, cache_config) -> str:
+    """
+    Engine for ``mode``. The cache-backed modes need ``cache_config``,
+    the ``SESSION_CACHE_ALIAS`` cache, to be shared by every process:
+    with a per-process cache a logout or cart change in one worker is
+    never seen by the others.
+    """
+    if mode not in SESSION_ENGINES:
+        raise ImproperlyConfigured(
+            f"SESSION_MODE must be one of {', '.join(SESSION_ENGINES)}"
+        )
+    if mode in CACHE_SESSION_MODES and not is_shared_cache(cache_config):
+        raise ImproperlyConfigured(
+            f"SESSION_MODE {mode} needs a shared cache; set CACHE_URL"
+        )
+    return SESSION_ENGINES[mode]
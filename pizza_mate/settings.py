@@ -1,7 +1,9 @@
 import os
 from pathlib import Path
 
-import dj_database_url
+from pizza_mate.caches import get_cache_config
+from pizza_mate.database import get_database_config
+from pizza_mate.sessions import get_session_engine
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,8 +37,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "pizza_mate.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "pizza_mate.middleware.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -47,6 +50,51 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "pizza_mate.urls"
 
+# Per-request query/timing metrics, Server-Timing headers and a staff-only
+# summary at /metrics/requests/. The middleware is dropped when disabled.
+REQUEST_METRICS_ENABLED = (
+    os.environ.get("REQUEST_METRICS_ENABLED", "") == "True"
+)
+REQUEST_METRICS_WINDOW = 1000
+
+# Background tasks queued in the database and run by
+# `manage.py run_workers`. Failed tasks are retried after
+# TASK_RETRY_BACKOFF * 2 ** (attempt - 1) seconds, capped at the max.
+TASK_WORKER_PROCESSES = int(os.environ.get("TASK_WORKER_PROCESSES", 2))
+TASK_POLL_INTERVAL = 1.0
+TASK_RETRY_BACKOFF = 10
+TASK_RETRY_BACKOFF_MAX = 60 * 60
+TASK_LOCK_TIMEOUT = 10 * 60
+# `run_workers` sweeps every SWEEP_INTERVAL seconds: expired sessions,
+# and tasks finished longer ago than their retention
+SWEEP_INTERVAL = 60 * 60
+TASK_RETENTION = 7 * 24 * 60 * 60
+TASK_FAILED_RETENTION = 30 * 24 * 60 * 60
+
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "pizza_mate.metrics": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "pizza.tasks": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -64,21 +112,45 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "pizza_mate.wsgi.application"
+ASGI_APPLICATION = "pizza_mate.asgi.application"
+
+# Serve the menu, detail and recalculation views from their async versions.
+# Only worthwhile under ASGI (uvicorn workers); see README.
+PIZZA_ASYNC_VIEWS = os.environ.get("PIZZA_ASYNC_VIEWS", "") == "True"
 
 AUTH_USER_MODEL = 'pizza.CustomUser'
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 
+# Connection reuse is configured from the environment; see
+# pizza_mate/database.py for DB_CONNECTION_MODE and the pool sizes
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": get_database_config(
+        os.environ,
+        {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        },
+    )
 }
 
-db_from_env = dj_database_url.config(conn_max_age=500)
-DATABASES["default"].update(db_from_env)
+# Set CACHE_URL to a Redis server shared by all web and worker processes;
+# see pizza_mate/caches.py for what happens without one
+CACHES = get_cache_config(os.environ)
+
+# Cache alias for the ingredient catalogue version. With several workers it
+# should point at a shared backend; PIZZA_CATALOGUE_SHARED also stores the
+# catalogue itself there so a new version is loaded from the DB only once.
+PIZZA_CATALOGUE_CACHE = os.environ.get("PIZZA_CATALOGUE_CACHE", "default")
+PIZZA_CATALOGUE_SHARED = os.environ.get("PIZZA_CATALOGUE_SHARED", "") == "True"
+
+# Where sessions live; see pizza_mate/sessions.py for the trade-offs.
+# The cache-backed modes need a cache shared by all workers.
+SESSION_CACHE_ALIAS = os.environ.get("SESSION_CACHE_ALIAS", "default")
+SESSION_ENGINE = get_session_engine(
+    os.environ.get("SESSION_MODE", "db"), CACHES[SESSION_CACHE_ALIAS]
+)
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,6 +184,10 @@ STATICFILES_DIRS = (BASE_DIR / "static",)
 
 STATIC_ROOT = "staticfiles/"
 
+# collectstatic writes hashed, pre-compressed files and a manifest; see
+# pizza_mate/storage.py
+STATICFILES_STORAGE = "pizza_mate.storage.FingerprintedStaticFilesStorage"
+
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -0,0 +1,21 @@
+"""
+Static files are collected under content-hashed names with gzip (and,
+with the ``Brotli`` package installed, Brotli) copies next to them, and
+``staticfiles.json`` maps every source name to its hashed name. WhiteNoise
+serves hashed files with a far-future ``immutable`` Cache-Control, so a
+returning visitor never revalidates them; a changed file gets a new URL.
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class FingerprintedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Before ``collectstatic`` has written a manifest, as in development and
+    tests, files keep their own names. Once it exists a file missing from
+    it is an error rather than a silently unhashed URL.
+    """
+
+    def stored_name(self, name) -> str:
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -3,10 +3,17 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include, re_path
 
+from pizza_mate.views import request_metrics_view
+
 urlpatterns = [
                   path("admin/", admin.site.urls),
                   path("", include("pizza.urls", namespace="pizza")),
                   path("accounts/", include("django.contrib.auth.urls")),
+                  path(
+                      "metrics/requests/",
+                      request_metrics_view,
+                      name="request-metrics",
+                  ),
               ] + static(settings.STATIC_URL,
                          document_root=settings.STATIC_ROOT)
 
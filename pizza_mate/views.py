@@ -0,0 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from pizza_mate.middleware import request_metrics
+
+
+@staff_member_required
+def request_metrics_view(request) -> JsonResponse:
+    return JsonResponse(request_metrics.summary())
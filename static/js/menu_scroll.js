@@ -0,0 +1,56 @@
+// Infinite scroll for the menu. The "More pizzas" link at the end of each
+// page also names the fragment URL (pizza:menu-page) that returns only the
+// next page's cards; when the link scrolls into view the fragment replaces
+// it. Without JavaScript the link opens the next page as usual.
+(function () {
+  "use strict";
+
+  const container = document.getElementById("menu-cards");
+  if (!container || !("IntersectionObserver" in window)) {
+    return;
+  }
+
+  let loading = false;
+  const observer = new IntersectionObserver((entries) => {
+    entries.forEach((entry) => {
+      if (entry.isIntersecting) {
+        loadNextPage(entry.target);
+      }
+    });
+  }, { rootMargin: "600px 0px" });
+
+  function observeMoreLink() {
+    const link = container.querySelector(".menu-more a[data-fragment-url]");
+    if (link) {
+      observer.observe(link);
+    }
+  }
+
+  function loadNextPage(link) {
+    if (loading) {
+      return;
+    }
+    loading = true;
+    observer.unobserve(link);
+    fetch(link.dataset.fragmentUrl, { credentials: "same-origin" })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Menu page request failed: ${response.status}`);
+        }
+        return response.text();
+      })
+      .then((html) => {
+        link.closest(".menu-more").remove();
+        container.insertAdjacentHTML("beforeend", html);
+        observeMoreLink();
+      })
+      .catch(() => {
+        // Leave the plain link in place for the visitor to follow
+      })
+      .finally(() => {
+        loading = false;
+      });
+  }
+
+  observeMoreLink();
+})();
@@ -0,0 +1,109 @@
+// Prices ingredient and size changes on the pizza detail page without a
+// server round trip. Uses the rule of get_updated_pizza_prices in
+// pizza/recalculation.py; the server re-validates when the order is placed.
+(function () {
+  "use strict";
+
+  function updatedPrices(prices, difference, ingredientPrice) {
+    if (difference === 0) {
+      return prices;
+    }
+    const updated = {};
+    Object.keys(prices).forEach((size) => {
+      updated[size] = prices[size] + difference * ingredientPrice;
+    });
+    return updated;
+  }
+
+  function selectedQuantities(form) {
+    const quantities = {};
+    form.querySelectorAll('input[name="ingredients"]:checked').forEach((checkbox) => {
+      const input = form.querySelector(`input[name="ingredient_qty_${checkbox.value}"]`);
+      const quantity = parseInt(input.value, 10);
+      quantities[checkbox.value] = quantity >= 1 ? quantity : 1;
+    });
+    return quantities;
+  }
+
+  function isBaseSelection(quantities, baseIds) {
+    const ids = Object.keys(quantities);
+    return ids.length === baseIds.length
+      && baseIds.every((id) => quantities[String(id)] === 1);
+  }
+
+  function hiddenInput(name, value) {
+    const input = document.createElement("input");
+    input.type = "hidden";
+    input.name = name;
+    input.value = value;
+    return input;
+  }
+
+  function enhance(form, catalogue) {
+    const priceLabel = document.getElementById("pizza-price");
+    const sizeOptions = document.getElementById("size-options");
+    const orderForm = document.getElementById("order-form");
+    const orderIngredients = document.getElementById("order-ingredients");
+    const sizeInput = orderForm.querySelector('input[name="size"]');
+
+    function refresh() {
+      const quantities = selectedQuantities(form);
+      const total = Object.values(quantities).reduce((sum, quantity) => sum + quantity, 0);
+      const prices = updatedPrices(
+        catalogue.prices,
+        total - catalogue.pizza.ingredients.length,
+        catalogue.ingredient_price
+      );
+      const checkedSize = sizeOptions.querySelector("input:checked");
+      const size = checkedSize ? checkedSize.value : sizeInput.value;
+
+      priceLabel.textContent = `${size}: ${prices[size]} UAH`;
+      if (sizeInput.value !== size) {
+        const url = new URL(window.location.href);
+        url.searchParams.set("size", size);
+        window.history.replaceState(null, "", url);
+      }
+      sizeInput.value = size;
+      orderIngredients.replaceChildren();
+      if (!isBaseSelection(quantities, catalogue.pizza.ingredients)) {
+        // Marks the line as customised even when nothing is selected
+        orderIngredients.append(hiddenInput("customised", "1"));
+        Object.entries(quantities).forEach(([id, quantity]) => {
+          orderIngredients.append(
+            hiddenInput("ingredients", id),
+            hiddenInput(`ingredient_qty_${id}`, quantity)
+          );
+        });
+      }
+    }
+
+    form.addEventListener("change", refresh);
+    form.addEventListener("input", refresh);
+    form.addEventListener("submit", (event) => {
+      event.preventDefault();
+      refresh();
+    });
+    sizeOptions.addEventListener("change", refresh);
+    form.querySelector('button[type="submit"]').hidden = true;
+    sizeOptions.hidden = false;
+    refresh();
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    const form = document.getElementById("ingredients-form");
+    if (!form) {
+      return;
+    }
+    fetch(form.dataset.pricesUrl, { credentials: "same-origin" })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Price request failed: ${response.status}`);
+        }
+        return response.json();
+      })
+      .then((catalogue) => enhance(form, catalogue))
+      .catch(() => {
+        // The server-rendered "Update Ingredients" form keeps working
+      });
+  });
+})();